@@ -0,0 +1,106 @@
+# bench_client.py
+"""
+Compare per-call latency of the old "bare requests.post" path (new connection + new IAM
+token for every message) with the shared pooled client in utils/watsonx_client.py.
+
+By default a stub server (stub_watsonx.py) is started in-process on a free local port.
+Point --url at another stand-in (e.g. a TLS-terminating proxy in front of the stub) to
+include TLS handshake cost in the cold numbers.
+
+Run:
+    python bench_client.py --calls 50
+"""
+import argparse
+import os
+import statistics
+import time
+
+
+def _start_stub():
+    from stub_watsonx import StubConfig, start_server
+
+    StubConfig.first_token_delay = 0.0
+    StubConfig.token_delay = 0.0
+    server = start_server()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def _summary(name, samples):
+    ms = sorted(s * 1000 for s in samples)
+    p95 = ms[min(len(ms) - 1, int(round(0.95 * (len(ms) - 1))))]
+    print(f"{name:<28} n={len(ms):<4} mean={statistics.mean(ms):7.2f}ms  p50={statistics.median(ms):7.2f}ms  p95={p95:7.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold vs warm watsonx client latency")
+    parser.add_argument("--calls", type=int, default=30)
+    parser.add_argument("--url", default="", help="base URL of a stand-in server (default: in-process stub)")
+    args = parser.parse_args()
+
+    server = None
+    base = args.url.rstrip("/")
+    if not base:
+        server, base = _start_stub()
+    os.environ["IBM_APIKEY"] = os.environ.get("IBM_APIKEY") or "bench-key"
+    os.environ["WATSONX_DEPLOYMENT_ID"] = os.environ.get("WATSONX_DEPLOYMENT_ID") or "bench"
+    os.environ["WATSONX_RUNTIME_URL"] = base
+    os.environ["IBM_IAM_URL"] = f"{base}/identity/token"
+
+    import requests
+    from utils import watsonx_client as wc
+
+    messages = [{"role": "system", "content": "You are a test."}, {"role": "user", "content": "Hello"}]
+    endpoint = f"{wc.ML_BASE}/ml/v1/deployments/{wc.DEPLOYMENT_ID}/text/chat?version={wc.API_VERSION}"
+
+    def cold_call():
+        # Mirrors the pre-pooling code: fresh IAM exchange and fresh connection per message
+        t = requests.post(
+            wc.IAM_URL,
+            data={"grant_type": "urn:ibm:params:oauth:grant-type:apikey", "apikey": wc.IBM_APIKEY},
+            headers={"Content-Type": "application/x-www-form-urlencoded"},
+            timeout=30,
+        ).json()["access_token"]
+        r = requests.post(
+            endpoint,
+            headers={"Authorization": f"Bearer {t}", "Content-Type": "application/json", "Accept": "application/json"},
+            json={"messages": wc._normalize_messages_for_deployment(messages)},
+            timeout=60,
+        )
+        r.raise_for_status()
+        r.json()
+
+    def warm_call():
+        res = wc.infer_with_system_messages(messages)
+        if not res.get("ok"):
+            raise RuntimeError(res.get("text"))
+
+    try:
+        cold = []
+        for _ in range(args.calls):
+            t0 = time.perf_counter()
+            cold_call()
+            cold.append(time.perf_counter() - t0)
+
+        wc.reset_session()
+        t0 = time.perf_counter()
+        warm_call()  # first call opens the pooled connections and fetches the token
+        first = time.perf_counter() - t0
+
+        warm = []
+        for _ in range(args.calls):
+            t0 = time.perf_counter()
+            warm_call()
+            warm.append(time.perf_counter() - t0)
+
+        print(f"target: {base}")
+        _summary("cold (bare requests.post)", cold)
+        _summary("pooled first call", [first])
+        _summary("pooled warm", warm)
+        print(f"warm speed-up (p50): {statistics.median(cold) / statistics.median(warm):.1f}x")
+    finally:
+        if server is not None:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
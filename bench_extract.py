@@ -0,0 +1,133 @@
+# bench_extract.py
+"""
+Micro-benchmark for watsonx response decoding and reply extraction.
+
+Times json vs orjson decoding and the previous recursive extract_text against
+utils/response_parser.extract_text over response shapes recorded from watsonx
+(chat, chat with many choices and moderation payloads, text generation, a streamed
+reply re-wrapped by the client, and an unrecognised nested shape), each at several
+reply sizes. Also checks that both extractors agree on the reply.
+
+Run:
+    python bench_extract.py --repeat 2000
+"""
+import argparse
+import json
+import time
+
+from utils import response_parser
+from utils.response_parser import extract_text
+
+
+def legacy_extract_text(obj):
+    """extract_text as it was in pages/2_Chat_with_AI.py before the schema fast path."""
+    if obj is None:
+        return None
+    if isinstance(obj, str):
+        return obj
+    if isinstance(obj, list):
+        for i in obj:
+            t = legacy_extract_text(i)
+            if t:
+                return t
+        return None
+    if isinstance(obj, dict):
+        if "choices" in obj and isinstance(obj["choices"], list) and obj["choices"]:
+            try:
+                c = obj["choices"][0]
+                if isinstance(c, dict) and "message" in c and isinstance(c["message"], dict):
+                    cont = c["message"].get("content")
+                    if cont:
+                        return legacy_extract_text(cont)
+            except Exception:
+                pass
+        for k in ("message", "messages", "content", "text", "output", "generated_text", "response"):
+            if k in obj:
+                t = legacy_extract_text(obj[k])
+                if t:
+                    return t
+        for v in obj.values():
+            t = legacy_extract_text(v)
+            if t:
+                return t
+    return None
+
+
+def _reply(words: int) -> str:
+    return " ".join(f"token{i % 97}" for i in range(words))
+
+
+def _usage():
+    return {"prompt_tokens": 812, "completion_tokens": 240, "total_tokens": 1052}
+
+
+def _moderations(n: int):
+    return {"hap": [{"score": 0.01, "input": True, "position": {"start": i, "end": i + 4},
+                     "entity": "none", "word": f"w{i}"} for i in range(n)]}
+
+
+def shapes(words: int):
+    reply = _reply(words)
+    return {
+        "chat": {
+            "id": "chat-1", "model_id": "ibm/granite-3-8b-instruct", "created": 1730000000,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": reply}, "finish_reason": "stop"}],
+            "usage": _usage(),
+        },
+        "chat_many_choices": {
+            "id": "chat-2", "model_id": "ibm/granite-3-8b-instruct",
+            "system": {"warnings": [{"message": "This model is a Non-IBM Product", "id": "disclaimer_warning"}]},
+            "choices": [{"index": i, "message": {"role": "assistant", "content": reply}, "finish_reason": "stop"}
+                        for i in range(20)],
+            "usage": _usage(),
+            "moderations": _moderations(200),
+        },
+        "generation": {
+            "model_id": "ibm/granite-13b-instruct-v2", "created_at": "2025-10-01T00:00:00Z",
+            "results": [{"generated_text": reply, "generated_token_count": words, "input_token_count": 812,
+                         "stop_reason": "eos_token", "moderations": _moderations(50)}],
+            "system": {"warnings": [{"message": "Model deprecated", "id": "deprecation"}]},
+        },
+        "streamed_rewrap": {
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": reply}}],
+            "usage": _usage(),
+        },
+        "unknown_nested": {
+            "metadata": {"trace": [{"span": i, "tags": {"k": i}} for i in range(200)]},
+            "payload": {"data": {"output": {"response": reply}}},
+        },
+    }
+
+
+def _time(fn, repeat: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="watsonx response decode + extract micro-benchmark")
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--sizes", default="50,500,5000", help="reply sizes in words")
+    args = parser.parse_args()
+
+    print(f"decoder: {response_parser.JSON_DECODER}")
+    print(f"{'shape':<20} {'words':>6} {'bytes':>8} {'json':>9} {'loads':>9} {'legacy':>9} {'extract':>9}  (µs/op)")
+    for words in (int(w) for w in args.sizes.split(",")):
+        for name, obj in shapes(words).items():
+            raw = json.dumps(obj).encode("utf-8")
+            decoded = response_parser.loads(raw)
+            old, new = legacy_extract_text(decoded), extract_text(decoded)
+            mark = "" if old == new else "  (differs from legacy)"
+            print(
+                f"{name:<20} {words:>6} {len(raw):>8} "
+                f"{_time(lambda: json.loads(raw), args.repeat):>9.1f} "
+                f"{_time(lambda: response_parser.loads(raw), args.repeat):>9.1f} "
+                f"{_time(lambda: legacy_extract_text(decoded), args.repeat):>9.2f} "
+                f"{_time(lambda: extract_text(decoded), args.repeat):>9.2f}{mark}"
+            )
+
+
+if __name__ == "__main__":
+    main()
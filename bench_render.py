@@ -0,0 +1,265 @@
+# bench_render.py
+"""
+Render benchmarks for the landing page and the chat page, run headless with
+Streamlit's AppTest.
+
+Measures full script runs of landing.py and pages/2_Chat_with_AI.py, and each
+section renderer on its own (hero, skills, project carousel, glass project grid,
+certificate grid, contact card) with its data scaled to the requested sizes.
+Every case reports median wall time, HTML bytes handed to st.markdown /
+components.html, and peak Python memory (tracemalloc, measured in a separate run so
+it does not distort the timings).
+
+A case fails when it exceeds its budget; the process then exits with status 1.
+Budgets are per case name ("landing", "chat", "carousel@100", or "carousel" for every
+size) and can be overridden with --budget-file (JSON of the same shape as BUDGETS).
+
+The chat page talks to an in-process stub_watsonx server, so no credentials are needed.
+
+Run:
+    python bench_render.py
+    python bench_render.py --sizes 10,100,1000 --repeat 3 --only carousel,cert_grid
+"""
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+
+# Upper limits per case: seconds, html_bytes, peak_bytes. Keys are case names with or
+# without "@size"; the most specific key wins.
+BUDGETS = {
+    "landing": {"seconds": 2.0, "html_bytes": 16_000_000, "peak_bytes": 200_000_000},
+    "chat": {"seconds": 2.0, "html_bytes": 1_500_000, "peak_bytes": 100_000_000},
+    "hero": {"seconds": 0.5, "html_bytes": 50_000, "peak_bytes": 20_000_000},
+    "contact": {"seconds": 0.5, "html_bytes": 3_000_000, "peak_bytes": 50_000_000},
+    "skills": {"seconds": 0.5, "html_bytes": 2_000_000, "peak_bytes": 50_000_000},
+    "carousel@10": {"seconds": 1.0, "html_bytes": 10_000_000, "peak_bytes": 150_000_000},
+    "glass_projects@10": {"seconds": 1.0, "html_bytes": 10_000_000, "peak_bytes": 150_000_000},
+    "cert_grid@10": {"seconds": 1.0, "html_bytes": 6_000_000, "peak_bytes": 100_000_000},
+    "carousel": {"seconds": 10.0, "html_bytes": 100_000_000, "peak_bytes": 1_500_000_000},
+    "glass_projects": {"seconds": 10.0, "html_bytes": 100_000_000, "peak_bytes": 1_500_000_000},
+    "cert_grid": {"seconds": 10.0, "html_bytes": 60_000_000, "peak_bytes": 1_000_000_000},
+}
+
+SIZED_TARGETS = ("skills", "carousel", "glass_projects", "cert_grid")
+UNSIZED_TARGETS = ("hero", "contact")
+
+
+# --- Scaled data: real entries cycled up to n, with unique titles ---
+def scaled_projects(n):
+    from utils.project import PROJECTS
+
+    return [dict(PROJECTS[i % len(PROJECTS)], title=f"{PROJECTS[i % len(PROJECTS)]['title']} #{i}") for i in range(n)]
+
+
+def scaled_certificates(n):
+    from utils.certificates import get_certificate_display_data
+
+    certs = get_certificate_display_data()
+    return [dict(certs[i % len(certs)], title=f"{certs[i % len(certs)]['title']} #{i}") for i in range(n)]
+
+
+def scaled_skills(n):
+    from utils.skill import skills
+
+    groups = [dict(g, items=[]) for g in skills]
+    flat = [it for g in skills for it in g["items"]]
+    for i in range(n):
+        groups[i % len(groups)]["items"].append(f"{flat[i % len(flat)]} {i}")
+    return groups
+
+
+def render_target(target, size):
+    """Call one section renderer the way landing.py does."""
+    import streamlit as st
+    from utils.constants import info, socials
+
+    if target == "hero":
+        from utils.hero import render_hero
+        render_hero(info, socials)
+    elif target == "contact":
+        from utils.contact import render_contact_professional
+        render_contact_professional(info=info, socials=socials)
+    elif target == "skills":
+        from utils.skill import render_skills_html
+        st.components.v1.html(f"<div style='color:white'>{render_skills_html(scaled_skills(size), columns=2)}</div>", height=480)
+    elif target == "carousel":
+        from utils.project import render_glass_carousel
+        render_glass_carousel(scaled_projects(size), height=500, card_width=520, visible=2)
+    elif target == "glass_projects":
+        from utils.project import render_glass_projects
+        render_glass_projects(scaled_projects(size))
+    elif target == "cert_grid":
+        from utils.certificates import build_certificate_grid_html
+        st.components.v1.html(build_certificate_grid_html(scaled_certificates(size)), height=520)
+    else:
+        raise ValueError(f"unknown target {target!r}")
+
+
+# --- HTML byte accounting ---
+class _Recorder:
+    html_bytes = 0
+
+
+@contextmanager
+def recording():
+    """Count bytes of HTML passed to st.markdown and components.html while active."""
+    import streamlit as st
+    import streamlit.components.v1 as components
+
+    orig_markdown, orig_html = st.markdown, components.html
+    _Recorder.html_bytes = 0
+
+    def markdown(body, *a, **k):
+        _Recorder.html_bytes += len(str(body).encode("utf-8"))
+        return orig_markdown(body, *a, **k)
+
+    def html(body, *a, **k):
+        _Recorder.html_bytes += len(str(body).encode("utf-8"))
+        return orig_html(body, *a, **k)
+
+    st.markdown, components.html = markdown, html
+    try:
+        yield _Recorder
+    finally:
+        st.markdown, components.html = orig_markdown, orig_html
+
+
+def _section_script(target, size):
+    # Runs as a Streamlit script inside AppTest; the renderer is timed on its own
+    import streamlit as st
+    from bench_render import render_target
+
+    render_target(target, size)
+
+
+# --- Runners ---
+def _run_app(make_app, trace):
+    at = make_app()
+    with recording() as rec:
+        if trace:
+            tracemalloc.start()
+        t0 = time.perf_counter()
+        at.run()
+        elapsed = time.perf_counter() - t0
+        peak = 0
+        if trace:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+    return elapsed, rec.html_bytes, peak
+
+
+def measure(make_app, repeat):
+    _run_app(make_app, trace=False)  # warm-up: first-time imports are not part of a rerun
+    timings, html_bytes = [], 0
+    for _ in range(repeat):
+        elapsed, html_bytes, _ = _run_app(make_app, trace=False)
+        timings.append(elapsed)
+    _, _, peak = _run_app(make_app, trace=True)
+    return {"seconds": statistics.median(timings), "html_bytes": html_bytes, "peak_bytes": peak}
+
+
+def _budget_for(budgets, case):
+    return budgets.get(case) or budgets.get(case.split("@")[0]) or {}
+
+
+def _start_stub():
+    from stub_watsonx import StubConfig, start_server
+
+    StubConfig.first_token_delay = 0.0
+    StubConfig.token_delay = 0.0
+    server = start_server()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    os.environ.update({
+        "IBM_APIKEY": "bench-key",
+        "WATSONX_DEPLOYMENT_ID": "bench",
+        "WATSONX_RUNTIME_URL": base,
+        "IBM_IAM_URL": f"{base}/identity/token",
+    })
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless render benchmarks (Streamlit AppTest)")
+    parser.add_argument("--sizes", default="10,100", help="item counts for sized sections (e.g. 10,100,1000)")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per case (median is reported)")
+    parser.add_argument("--only", default="", help="comma-separated case names to run")
+    parser.add_argument("--budget-file", default="", help="JSON file overriding BUDGETS")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    os.chdir(ROOT)
+    sys.path.insert(0, str(ROOT))
+    server = _start_stub()
+
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+
+    # Keep the report readable (components.html deprecation notices are logged on every call)
+    logging.getLogger("streamlit.deprecation_util").disabled = True
+
+    # st.page_link needs the multipage registry, which AppTest does not build for a single file
+    st.page_link = lambda *a, **k: None
+
+    budgets = dict(BUDGETS)
+    if args.budget_file:
+        budgets.update(json.loads(Path(args.budget_file).read_text()))
+    only = {c.strip() for c in args.only.split(",") if c.strip()}
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+
+    cases = [
+        ("landing", lambda: AppTest.from_file(str(ROOT / "landing.py"), default_timeout=120)),
+        ("chat", lambda: AppTest.from_file(str(ROOT / "pages" / "2_Chat_with_AI.py"), default_timeout=120)),
+    ]
+    for target in UNSIZED_TARGETS:
+        cases.append((target, lambda t=target: AppTest.from_function(_section_script, args=(t, 0), default_timeout=120)))
+    for target in SIZED_TARGETS:
+        for size in sizes:
+            cases.append((f"{target}@{size}", lambda t=target, n=size: AppTest.from_function(
+                _section_script, args=(t, n), default_timeout=120)))
+
+    results, failures = [], []
+    try:
+        for case, make_app in cases:
+            if only and case not in only and case.split("@")[0] not in only:
+                continue
+            res = measure(make_app, max(1, args.repeat))
+            res["case"] = case
+            over = [k for k, limit in _budget_for(budgets, case).items() if res.get(k, 0) > limit]
+            res["over_budget"] = over
+            results.append(res)
+            if over:
+                failures.append(case)
+            if not args.json:
+                flag = f"  OVER BUDGET: {', '.join(over)}" if over else ""
+                print(f"{case:<20} {res['seconds'] * 1000:9.1f}ms  html={res['html_bytes'] / 1024:10.1f}KiB  "
+                      f"peak={res['peak_bytes'] / 1048576:8.1f}MiB{flag}", flush=True)
+    finally:
+        server.shutdown()
+
+    from utils.asset_registry import get_asset_registry
+    from utils.fragment_cache import get_fragment_cache
+
+    if args.json:
+        print(json.dumps({"cases": results, "asset_registry": get_asset_registry().stats(),
+                          "fragment_cache": get_fragment_cache().stats()}, indent=2))
+    else:
+        print(f"asset registry: {get_asset_registry().stats()}")
+        print(f"fragment cache: {get_fragment_cache().stats()}")
+    if failures:
+        print(f"{len(failures)} case(s) over budget: {', '.join(failures)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
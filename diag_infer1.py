@@ -1,10 +1,12 @@
 # diag_infer1.py  
 from dotenv import load_dotenv
 import os
-import requests
 import json
 import sys
 
+from utils.response_parser import extract_text
+from utils.watsonx_client import get_iam_token_cached, get_session
+
 load_dotenv()
 
 API_KEY = os.getenv("IBM_APIKEY")
@@ -17,42 +19,8 @@ if not (API_KEY and ML_URL and DEPLOYMENT_ID):
     sys.exit(1)
 
 def get_token():
-    """Exchange API key for IAM access token"""
-    url = "https://iam.cloud.ibm.com/identity/token"
-    data = {
-        "grant_type": "urn:ibm:params:oauth:grant-type:apikey",
-        "apikey": API_KEY
-    }
-    headers = {"Content-Type": "application/x-www-form-urlencoded"}
-    r = requests.post(url, data=data, headers=headers, timeout=30)
-    r.raise_for_status()
-    return r.json()["access_token"]
-
-def extract_text(obj):
-    """Find a readable assistant message inside various possible JSON shapes."""
-    if obj is None:
-        return None
-    if isinstance(obj, str):
-        return obj
-    if isinstance(obj, list):
-        for item in obj:
-            t = extract_text(item)
-            if t:
-                return t
-        return None
-    if isinstance(obj, dict):
-        # common keys where text can live
-        for k in ("choices", "message", "messages", "content", "text", "output", "generated_text", "response"):
-            if k in obj:
-                t = extract_text(obj[k])
-                if t:
-                    return t
-        # search all values
-        for v in obj.values():
-            t = extract_text(v)
-            if t:
-                return t
-    return None
+    """Return the IAM access token from the shared, process-wide token cache."""
+    return get_iam_token_cached()
 
 def infer_chat(prompt: str, timeout: int = 60):
     """
@@ -69,7 +37,7 @@ def infer_chat(prompt: str, timeout: int = 60):
     }
     payload = {"messages": [{"role": "user", "content": prompt}]}
 
-    r = requests.post(endpoint, headers=headers, json=payload, timeout=timeout)
+    r = get_session().post(endpoint, headers=headers, json=payload, timeout=timeout)
     if not r.ok:
         return {"ok": False, "status": r.status_code, "text": r.text}
     try:
@@ -2,10 +2,8 @@
 import streamlit as st
 import streamlit.components.v1 as components
 import traceback
-import base64
 from pathlib import Path
 from typing import List, Dict
-from html import escape
 
 # ================= PAGE CONFIG =================
 st.set_page_config(
@@ -53,7 +51,7 @@ render_top_nav()
 
 # ================= CONSTANTS =================
 try:
-    from utils.constants import info, socials
+    from utils.profile_data import info, socials
 except Exception:
     info = {
         "name": "Keerthana S",
@@ -72,14 +70,15 @@ except Exception:
 
 # ================= PROJECTS =================
 try:
-    from utils.project import PROJECTS, render_glass_carousel
+    from utils.constants import PROJECTS
+    from utils.project import render_glass_carousel
 except Exception:
     PROJECTS = []
     render_glass_carousel = None
 
 # ================= CERTIFICATES =================
 try:
-    from utils.certificates import get_certificate_display_data
+    from utils.certificates import build_certificate_grid_html, get_certificate_display_data
 except Exception:
     def get_certificate_display_data(): return []
 
@@ -121,77 +120,7 @@ def render_landing():
     if not certs:
         st.info("No certificates added yet.")
     else:
-        cards_html = ""
-
-        for c in certs:
-            title = escape(c.get("title", ""))
-            issuer = escape(c.get("issuer", ""))
-            date = escape(c.get("date", ""))
-            category = escape(c.get("category", "").upper())
-
-            # image
-            img_b64 = ""
-            try:
-                raw = Path(c.get("image", "")).read_bytes()
-                img_b64 = "data:image/png;base64," + base64.b64encode(raw).decode()
-            except Exception:
-                pass
-
-            thumb = (
-                f"<img class='cert-thumb' src='{img_b64}'>"
-                if img_b64
-                else "<div class='cert-thumb-placeholder'>No Image</div>"
-            )
-
-            pill = f"<div class='cert-category'>{category}</div>" if category else ""
-
-            cards_html += f"""
-            <div class="cert-card">
-                <div class="cert-thumb-wrap">{thumb}</div>
-                <div class="cert-meta">
-                    {pill}
-                    <div class="cert-title">{title}</div>
-                    <div class="cert-issuer">{issuer} • {date}</div>
-                </div>
-            </div>
-            """
-
-        st.components.v1.html(f"""
-<style>
-.cert-grid {{
-  display:grid;
-  grid-template-columns:repeat(2,1fr);
-  gap:22px;
-}}
-@media(max-width:900px){{.cert-grid{{grid-template-columns:1fr;}}}}
-.cert-card {{
-  display:flex; gap:16px; padding:16px;
-  border-radius:14px;
-  background:rgba(255,255,255,0.04);
-  border:1px solid rgba(255,255,255,0.08);
-}}
-.cert-thumb{{width:120px;height:120px;object-fit:cover;border-radius:10px;}}
-.cert-thumb-placeholder{{width:120px;height:120px;
-  background:rgba(255,255,255,0.12);
-  display:flex;align-items:center;justify-content:center;
-}}
-.cert-title{{font-weight:700;color:white}}
-.cert-issuer{{font-size:14px;color:#dbeafe}}
-.cert-category {{
-  display:inline-block;
-  margin-bottom:6px;
-  padding:4px 10px;
-  font-size:11px;
-  font-weight:700;
-  border-radius:999px;
-  color:#93c5fd;
-  background:rgba(59,130,246,0.15);
-  border:1px solid rgba(59,130,246,0.3);
-}}
-</style>
-
-<div class="cert-grid">{cards_html}</div>
-""", height=520)
+        st.components.v1.html(build_certificate_grid_html(certs), height=520)
 
     # -------- CONTACT --------
     add_anchor("contact_section")
@@ -0,0 +1,205 @@
+# load_watsonx.py
+"""
+Load generator for the chat inference path, runnable fully offline.
+
+Simulated recruiter sessions (one thread each) send questions through
+utils.watsonx_client.infer_with_system_messages (or the streaming variant) with the
+real compiled system instruction, and the run reports p50/p95/p99 latency,
+throughput and an error breakdown, plus token-manager and retry/breaker counters.
+
+By default stub_watsonx.py is started in a subprocess on a free port (so the server
+does not compete with the sessions for the GIL); any stub option can be passed after
+`--`. Use --url to target an already running stand-in instead.
+
+Run:
+    python load_watsonx.py --sessions 20 --messages 5
+    python load_watsonx.py --sessions 20 --messages 5 --route --coalesce
+    python load_watsonx.py --sessions 50 --stream -- --latency lognormal:0.4,0.5 --token-rate 40 --error-mix 429:0.05,503:0.02
+"""
+import argparse
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List
+
+QUESTIONS = [
+    "What are her skills?",
+    "What projects has she built?",
+    "Tell me about her internship experience.",
+    "Which certifications does she have?",
+    "How can I contact her?",
+    "When can she start work?",
+    "What is her latest project?",
+    "Is she a good fit for a GenAI engineer role?",
+]
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _start_stub(stub_args: List[str]):
+    port = _free_port()
+    proc = subprocess.Popen(
+        [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "stub_watsonx.py"),
+         "--port", str(port), *stub_args],
+        stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+    )
+    line = proc.stdout.readline()
+    if "listening" not in line:
+        proc.kill()
+        raise RuntimeError(f"stub did not start: {line.strip()}")
+    return proc, f"http://127.0.0.1:{port}"
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))]
+
+
+def _outcome(result: Dict) -> str:
+    if result.get("ok"):
+        return "ok"
+    if result.get("circuit_open"):
+        return "circuit_open"
+    return f"status_{result.get('status', 0)}"
+
+
+def _report(title: str, samples: List[float]):
+    ms = sorted(s * 1000 for s in samples)
+    if not ms:
+        print(f"{title:<14} n=0")
+        return
+    print(f"{title:<14} n={len(ms):<5} p50={_percentile(ms, 0.50):8.1f}ms  p95={_percentile(ms, 0.95):8.1f}ms  "
+          f"p99={_percentile(ms, 0.99):8.1f}ms  max={ms[-1]:8.1f}ms")
+
+
+def main():
+    argv = sys.argv[1:]
+    stub_args = []
+    if "--" in argv:
+        i = argv.index("--")
+        argv, stub_args = argv[:i], argv[i + 1:]
+    parser = argparse.ArgumentParser(description="Concurrent load test of the watsonx chat path")
+    parser.add_argument("--sessions", type=int, default=20, help="concurrent simulated sessions")
+    parser.add_argument("--messages", type=int, default=5, help="messages per session")
+    parser.add_argument("--think-time", type=float, default=0.0, help="max random pause between a session's messages (s)")
+    parser.add_argument("--stream", action="store_true", help="use infer_stream_with_system_messages")
+    parser.add_argument("--url", default="", help="base URL of a running stand-in (default: start stub_watsonx.py)")
+    parser.add_argument("--route", action="store_true", help="answer deterministic intents locally (utils.intent_router), as the chat page does")
+    parser.add_argument("--coalesce", action="store_true", help="share identical in-flight questions (utils.single_flight), as the chat page does")
+    parser.add_argument("--metrics", action="store_true", help="print the Prometheus metrics page (utils.metrics) at the end")
+    parser.add_argument("--no-retry", action="store_true", help="one attempt per message, to see raw upstream errors")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+    random.seed(args.seed)
+
+    proc = None
+    base = args.url.rstrip("/")
+    if not base:
+        proc, base = _start_stub(stub_args)
+    # Must be set before the client module reads its configuration
+    os.environ["IBM_APIKEY"] = os.environ.get("IBM_APIKEY") or "load-key"
+    os.environ["WATSONX_DEPLOYMENT_ID"] = os.environ.get("WATSONX_DEPLOYMENT_ID") or "load"
+    os.environ["WATSONX_RUNTIME_URL"] = base
+    os.environ["IBM_IAM_URL"] = f"{base}/identity/token"
+    if args.no_retry:
+        os.environ["WATSONX_MAX_ATTEMPTS"] = "1"
+
+    from utils import watsonx_client as wc
+    from utils.prompt_builder import get_compiled_prompt, system_instruction_for
+    from utils.resilience import resilience_stats
+    from utils.token_budget import generation_params
+    from utils.intent_router import get_intent_router
+    from utils.profile_store import get_profile_store
+    from utils.single_flight import get_single_flight
+
+    instruction = get_compiled_prompt(lambda: {"name": "Keerthana", "headline": "GenAI Engineer"}).instruction
+    lock = threading.Lock()
+    latencies: List[float] = []
+    ok_latencies: List[float] = []
+    ttfts: List[float] = []
+    outcomes: Counter = Counter()
+    start_gate = threading.Event()
+
+    def session(n: int):
+        start_gate.wait()
+        for _ in range(args.messages):
+            question = random.choice(QUESTIONS)
+            if args.route and get_intent_router().route(question, get_profile_store().snapshot()):
+                with lock:
+                    outcomes["routed"] += 1
+                continue
+            messages = [
+                {"role": "system", "content": system_instruction_for(question, instruction)},
+                {"role": "user", "content": question},
+            ]
+            t0 = time.perf_counter()
+            try:
+                def call(publish, messages=messages, question=question):
+                    if args.stream:
+                        return wc.infer_stream_with_system_messages(messages, on_delta=publish, params=generation_params(question))
+                    return wc.infer_with_system_messages(messages, params=generation_params(question))
+
+                if args.coalesce:
+                    result, _ = get_single_flight().run(question, call)
+                else:
+                    result = call(lambda partial: None)
+            except Exception as e:
+                result = {"ok": False, "status": 0, "text": str(e)}
+            elapsed = time.perf_counter() - t0
+            with lock:
+                latencies.append(elapsed)
+                outcomes[_outcome(result)] += 1
+                if result.get("ok"):
+                    ok_latencies.append(elapsed)
+                    if result.get("ttft") is not None:
+                        ttfts.append(result["ttft"])
+            if args.think_time:
+                time.sleep(random.uniform(0, args.think_time))
+
+    threads = [threading.Thread(target=session, args=(i,), daemon=True) for i in range(args.sessions)]
+    try:
+        for t in threads:
+            t.start()
+        began = time.perf_counter()
+        start_gate.set()
+        for t in threads:
+            t.join()
+        duration = time.perf_counter() - began
+
+        total = len(latencies) + outcomes["routed"]
+        print(f"target: {base}  sessions={args.sessions}  messages/session={args.messages}  "
+              f"mode={'stream' if args.stream else 'blocking'}  stub args: {' '.join(stub_args) or '(defaults)'}")
+        print(f"requests: {total} in {duration:.2f}s  throughput={total / duration:.1f} req/s  "
+              f"successful={outcomes['ok'] / duration:.1f} req/s")
+        _report("latency (all)", latencies)
+        _report("latency (ok)", ok_latencies)
+        if ttfts:
+            _report("ttft", ttfts)
+        print("outcomes: " + ", ".join(f"{k}={v} ({v / total:.1%})" for k, v in outcomes.most_common()))
+        print(f"retries: {resilience_stats()}")
+        print(f"iam: {wc.get_token_manager().stats()}")
+        if args.route:
+            print(f"router: {get_intent_router().stats()}")
+        if args.coalesce:
+            print(f"single-flight: {get_single_flight().stats()}")
+        if args.metrics:
+            from utils.metrics import render_prometheus
+            print(render_prometheus(), end="")
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=5)
+
+
+if __name__ == "__main__":
+    main()
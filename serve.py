@@ -0,0 +1,45 @@
+# serve.py
+"""
+Production entry point: the portfolio as an ASGI app (st.App) with long-lived cache
+headers on the content-hashed images under /app/static/assets/ (see utils/static_assets.py)
+and chat pipeline metrics in Prometheus text format at /metrics (see utils/metrics.py;
+loopback clients only unless METRICS_TOKEN is set). FAQ answers are warmed in the
+background when the server starts (see utils/faq_warmup.py).
+
+Run:
+    streamlit run serve.py
+    uvicorn serve:app --host 0.0.0.0 --port 8501
+    curl http://127.0.0.1:8501/metrics
+"""
+from contextlib import asynccontextmanager
+
+import streamlit as st
+from starlette.middleware import Middleware
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from utils.faq_warmup import warm_faq
+from utils.metrics import PROMETHEUS_CONTENT_TYPE, metrics_allowed, render_prometheus
+from utils.static_assets import ImmutableAssetHeaders
+
+
+async def metrics(request):
+    host = request.client.host if request.client else ""
+    if not metrics_allowed(host, request.headers.get("authorization", "")):
+        return PlainTextResponse("forbidden\n", status_code=403)
+    return PlainTextResponse(render_prometheus(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # Starts background threads and returns at once; the first chat visitor finds the answers ready
+    warm_faq()
+    yield
+
+
+app = st.App(
+    "landing.py",
+    lifespan=lifespan,
+    routes=[Route("/metrics", metrics, methods=["GET"])],
+    middleware=[Middleware(ImmutableAssetHeaders)],
+)
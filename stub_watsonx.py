@@ -0,0 +1,290 @@
+# stub_watsonx.py
+"""
+Local stand-in for the IBM IAM token endpoint and the watsonx deployment chat endpoints,
+so the chat page can be exercised offline.
+
+Run:
+    python stub_watsonx.py --port 8089
+
+Then point the app at it (e.g. in .env):
+    IBM_APIKEY=dummy
+    WATSONX_DEPLOYMENT_ID=stub
+    IBM_ML_URL=http://127.0.0.1:8089
+    IBM_IAM_URL=http://127.0.0.1:8089/identity/token
+
+Fault injection (for retry / circuit-breaker testing):
+    python stub_watsonx.py --error-rate 0.3 --error-status 503 --retry-after 1
+    python stub_watsonx.py --error-mix 429:0.05,503:0.02   # several statuses at once
+    python stub_watsonx.py --reset-rate 0.2     # drop connections without a response
+    python stub_watsonx.py --stream-cut-after 2 # close streams after 2 tokens (no finish_reason)
+
+Latency and token rate (for load testing, see load_watsonx.py):
+    python stub_watsonx.py --latency lognormal:0.4,0.5 --token-rate 40 --iam-latency uniform:0.05,0.2
+Latency specs: fixed:S | uniform:LO,HI | normal:MEAN,SD | lognormal:MEDIAN,SIGMA | exp:MEAN (seconds)
+
+Endpoints:
+    POST /identity/token                                 -> IAM-style token JSON
+    POST /ml/v1/deployments/{id}/text/chat               -> full chat JSON
+    POST /ml/v1/deployments/{id}/text/chat_stream        -> server-sent events, one token per event
+"""
+import argparse
+import json
+import math
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CHAT_PATH = re.compile(r"^/ml/v1/deployments/[^/]+/text/(chat|chat_stream)$")
+
+DEFAULT_REPLY = (
+    "Keerthana is a GenAI Engineer and Data Scientist who builds RAG assistants, "
+    "LLMOps pipelines and Streamlit apps with Python, LangChain and Watsonx."
+)
+
+
+def parse_latency(spec: str):
+    """Sampler for a latency spec such as 'fixed:0.3' or 'lognormal:0.4,0.5' (seconds)."""
+    kind, _, params = spec.partition(":")
+    args = [float(x) for x in params.split(",") if x.strip()]
+    samplers = {
+        "fixed": lambda s: s,
+        "uniform": lambda lo, hi: random.uniform(lo, hi),
+        "normal": lambda mean, sd: random.gauss(mean, sd),
+        "lognormal": lambda median, sigma: median * math.exp(random.gauss(0.0, sigma)),
+        "exp": lambda mean: random.expovariate(1.0 / mean) if mean > 0 else 0.0,
+    }
+    if kind not in samplers:
+        raise ValueError(f"unknown latency distribution {kind!r} (use {', '.join(samplers)})")
+    fn = samplers[kind]
+    fn(*args)  # validate the parameter count now rather than on the first request
+    return lambda: max(0.0, fn(*args))
+
+
+def parse_error_mix(spec: str):
+    """'429:0.05,503:0.02' -> {429: 0.05, 503: 0.02}"""
+    mix = {}
+    for part in filter(None, (p.strip() for p in (spec or "").split(","))):
+        status, _, rate = part.partition(":")
+        mix[int(status)] = float(rate)
+    return mix
+
+
+class StubConfig:
+    reply = DEFAULT_REPLY
+    token_delay = 0.03       # seconds between streamed tokens
+    first_token_delay = 0.3  # seconds before the first streamed token / full reply
+    latency = None           # optional sampler replacing first_token_delay (see parse_latency)
+    iam_latency = None       # optional sampler for /identity/token
+    stream = True            # False -> chat_stream returns 404 (exercises the blocking fallback)
+    error_rate = 0.0         # fraction of chat calls answered with error_status
+    error_status = 503
+    error_mix = {}           # status -> fraction, applied in addition to error_rate
+    retry_after = None       # Retry-After header (seconds) sent with injected errors
+    reset_rate = 0.0         # fraction of chat calls whose connection is dropped without a response
+    stream_cut_after = None  # close chat_stream after this many tokens, without [DONE] / finish_reason
+
+    @classmethod
+    def first_token_wait(cls) -> float:
+        return cls.latency() if cls.latency is not None else cls.first_token_delay
+
+
+def _tokens(text: str):
+    """Split text into word-ish tokens that keep their trailing whitespace."""
+    return re.findall(r"\S+\s*", text)
+
+
+def _usage(prompt_chars: int, reply: str):
+    prompt_tokens = max(1, prompt_chars // 4)
+    completion_tokens = len(_tokens(reply))
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+    }
+
+
+def _reply_for(body: bytes):
+    """Configured reply cut to the request's max_tokens, plus its finish_reason."""
+    try:
+        max_tokens = json.loads(body or b"{}").get("max_tokens")
+    except (ValueError, AttributeError):
+        max_tokens = None
+    tokens = _tokens(StubConfig.reply)
+    if isinstance(max_tokens, int) and 0 < max_tokens < len(tokens):
+        return "".join(tokens[:max_tokens]).rstrip(), "length"
+    return StubConfig.reply, "stop"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # headers and body are written separately; avoid Nagle/delayed-ACK stalls on keep-alive
+    disable_nagle_algorithm = True
+    config = StubConfig
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def _read_body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _send_json(self, status: int, obj):
+        body = json.dumps(obj).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        path = self.path.split("?", 1)[0]
+        body = self._read_body()
+
+        if path == "/identity/token":
+            if self.config.iam_latency is not None:
+                time.sleep(self.config.iam_latency())
+            self._send_json(200, {
+                "access_token": "stub-token",
+                "token_type": "Bearer",
+                "expires_in": 3600,
+                "expiration": int(time.time()) + 3600,
+            })
+            return
+
+        m = CHAT_PATH.match(path)
+        if not m:
+            self._send_json(404, {"errors": [{"code": "not_found", "message": path}]})
+            return
+
+        if self._inject_fault():
+            return
+
+        if m.group(1) == "chat_stream":
+            if not self.config.stream:
+                self._send_json(404, {"errors": [{"code": "not_found", "message": "streaming disabled"}]})
+                return
+            self._stream_chat(body)
+        else:
+            reply, finish_reason = _reply_for(body)
+            time.sleep(self.config.first_token_wait() + self.config.token_delay * len(_tokens(reply)))
+            self._send_json(200, {
+                "id": "chat-stub",
+                "model_id": "stub",
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": reply}, "finish_reason": finish_reason}],
+                "usage": _usage(len(body), reply),
+            })
+
+    def _inject_fault(self) -> bool:
+        """Apply the configured connection resets / error responses. Returns True if one was sent."""
+        if self.config.reset_rate and random.random() < self.config.reset_rate:
+            self.close_connection = True
+            self.connection.close()
+            return True
+        status = None
+        roll = random.random()
+        for code, rate in [(self.config.error_status, self.config.error_rate)] + list(self.config.error_mix.items()):
+            if roll < rate:
+                status = code
+                break
+            roll -= rate
+        if status is not None:
+            body = json.dumps({"errors": [{"code": "injected_fault", "message": "stub fault injection"}]}).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            if self.config.retry_after is not None:
+                self.send_header("Retry-After", str(self.config.retry_after))
+            self.end_headers()
+            self.wfile.write(body)
+            return True
+        return False
+
+    def _stream_chat(self, body: bytes):
+        reply, finish_reason = _reply_for(body)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        def emit(obj):
+            self.wfile.write(f"event: message\ndata: {json.dumps(obj)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        time.sleep(self.config.first_token_wait())
+        for i, tok in enumerate(_tokens(reply)):
+            if i:
+                time.sleep(self.config.token_delay)
+            if StubConfig.stream_cut_after is not None and i >= StubConfig.stream_cut_after:
+                return
+            emit({"id": "chat-stub", "choices": [{"index": 0, "delta": {"content": tok}, "finish_reason": None}]})
+        emit({
+            "id": "chat-stub",
+            "choices": [{"index": 0, "delta": {"content": ""}, "finish_reason": finish_reason}],
+            "usage": _usage(len(body), reply),
+        })
+
+
+def start_server(host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """Serve the stub from a background thread; port 0 picks a free port."""
+    server = ThreadingHTTPServer((host, port), StubHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="watsonx-stub", daemon=True).start()
+    return server
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Offline watsonx / IAM stub server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--token-delay", type=float, default=StubConfig.token_delay, help="seconds between streamed tokens")
+    parser.add_argument("--token-rate", type=float, default=None, help="tokens per second (overrides --token-delay)")
+    parser.add_argument("--first-token-delay", type=float, default=StubConfig.first_token_delay, help="seconds before the first token")
+    parser.add_argument("--latency", default=None, help="first-token latency distribution (overrides --first-token-delay)")
+    parser.add_argument("--iam-latency", default=None, help="latency distribution of /identity/token")
+    parser.add_argument("--no-stream", action="store_true", help="answer chat_stream with 404 to test the blocking fallback")
+    parser.add_argument("--reply", default=DEFAULT_REPLY, help="assistant reply text")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of chat calls answered with --error-status")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--error-mix", default="", help="per-status error fractions, e.g. 429:0.05,503:0.02")
+    parser.add_argument("--retry-after", type=float, default=None, help="Retry-After seconds sent with injected errors")
+    parser.add_argument("--reset-rate", type=float, default=0.0, help="fraction of chat calls dropped without a response")
+    parser.add_argument("--stream-cut-after", type=int, default=None, help="close streams after N tokens, mid-reply")
+    return parser
+
+
+def configure(args):
+    """Apply parsed command-line options to StubConfig."""
+    StubConfig.token_delay = 1.0 / args.token_rate if args.token_rate else args.token_delay
+    StubConfig.first_token_delay = args.first_token_delay
+    StubConfig.latency = parse_latency(args.latency) if args.latency else None
+    StubConfig.iam_latency = parse_latency(args.iam_latency) if args.iam_latency else None
+    StubConfig.stream = not args.no_stream
+    StubConfig.reply = args.reply
+    StubConfig.error_rate = args.error_rate
+    StubConfig.error_status = args.error_status
+    StubConfig.error_mix = parse_error_mix(args.error_mix)
+    StubConfig.retry_after = args.retry_after
+    StubConfig.reset_rate = args.reset_rate
+    StubConfig.stream_cut_after = args.stream_cut_after
+
+
+def main():
+    args = build_parser().parse_args()
+    configure(args)
+
+    server = ThreadingHTTPServer((args.host, args.port), StubHandler)
+    print(f"watsonx stub listening on http://{args.host}:{args.port} (streaming={'on' if StubConfig.stream else 'off'})", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+# utils/asset_registry.py
+"""
+Process-wide registry of encoded image assets (data URIs, base64 payloads, derivative
+paths, static URLs), shared by all sessions.
+
+Entries are keyed by (source path, mtime, variant, kind), so editing a file simply
+makes its old entries unreachable; they are dropped as soon as the new version is
+stored. Memory is accounted by the size of each stored value and bounded by an LRU
+(ASSET_CACHE_MAX_BYTES). Each source file is read and encoded once per version.
+"""
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple, Union
+
+ASSET_CACHE_MAX_BYTES = int(os.getenv("ASSET_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+Value = Union[str, bytes]
+Key = Tuple[str, int, str, str]
+
+
+def _size(value: Value) -> int:
+    return len(value)  # base64/URLs are ASCII, so characters == bytes
+
+
+def _slot(key: Key) -> Tuple[str, str, str]:
+    """(path, variant, kind): what a key is for, independent of the file version."""
+    return (key[0], key[2], key[3])
+
+
+class AssetRegistry:
+    """Thread-safe, byte-bounded LRU of encoded assets."""
+
+    def __init__(self, max_bytes: int = ASSET_CACHE_MAX_BYTES):
+        self.max_bytes = max(0, int(max_bytes))
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Key, Value]" = OrderedDict()
+        self._current: Dict[Tuple[str, str, str], Key] = {}  # (path, variant, kind) -> live key
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.loaded_bytes = 0  # total size of values built (what the cache saves on hits)
+
+    @staticmethod
+    def key_for(path: Union[str, Path], variant: Optional[str], kind: str) -> Optional[Key]:
+        try:
+            p = Path(path).resolve()
+            mtime = p.stat().st_mtime_ns
+        except OSError:
+            return None
+        return (str(p), mtime, variant or "", kind)
+
+    def lookup(self, path, variant: Optional[str], kind: str) -> Optional[Value]:
+        key = self.key_for(path, variant, kind)
+        if key is None:
+            return None
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def store(self, path, variant: Optional[str], kind: str, value: Optional[Value]):
+        key = self.key_for(path, variant, kind)
+        if key is None or value is None or _size(value) > self.max_bytes:
+            return
+        with self._lock:
+            self.loaded_bytes += _size(value)
+            stale = self._current.get(_slot(key))
+            if stale is not None and stale != key:
+                self._drop(stale)
+            self._drop(key)
+            self._entries[key] = value
+            self._current[_slot(key)] = key
+            self.bytes += _size(value)
+            while self.bytes > self.max_bytes and self._entries:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def get(self, path, variant: Optional[str], kind: str, build: Callable[[], Optional[Value]]) -> Optional[Value]:
+        """Cached value, or `build()` (run outside the lock) stored and returned."""
+        value = self.lookup(path, variant, kind)
+        if value is not None:
+            return value
+        value = build()
+        self.store(path, variant, kind, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._current.clear()
+            self.bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "loaded_bytes": self.loaded_bytes,
+            }
+
+    def _drop(self, key: Key):
+        value = self._entries.pop(key, None)
+        if value is not None:
+            self.bytes -= _size(value)
+            if self._current.get(_slot(key)) == key:
+                del self._current[_slot(key)]
+
+
+# --- Process-wide instance shared by all sessions ---
+_registry: Optional[AssetRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_asset_registry() -> AssetRegistry:
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = AssetRegistry(ASSET_CACHE_MAX_BYTES)
+    return _registry
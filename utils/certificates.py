@@ -1,4 +1,9 @@
 # utils/certificates.py
+from html import escape
+
+from utils.fragment_cache import cached_fragment
+from utils.image_derivatives import ensure_derivatives
+from utils.static_assets import image_src
 
 certificates = [
     {
@@ -84,3 +89,82 @@ def certificates_as_text():
 
     return "\n".join(lines)
 
+
+
+@cached_fragment("cert_grid", sources=("utils/certificates.py",))
+def build_certificate_grid_html(certs):
+    """
+    Build the certificate grid HTML (cards with thumbnails) shown on the landing page.
+    Cached per certificate data (utils.fragment_cache).
+    """
+    cards_html = ""
+    ensure_derivatives([c.get("image", "") for c in certs], "cert_thumb")
+
+    for c in certs:
+        title = escape(c.get("title", ""))
+        issuer = escape(c.get("issuer", ""))
+        date = escape(c.get("date", ""))
+        category = escape(c.get("category", "").upper())
+
+        # image (120px derivative, see utils.image_derivatives)
+        img_b64 = ""
+        if c.get("image"):
+            src = image_src(c["image"], "cert_thumb")
+            if src != c["image"]:
+                img_b64 = src
+
+        thumb = (
+            f"<img class='cert-thumb' src='{img_b64}'>"
+            if img_b64
+            else "<div class='cert-thumb-placeholder'>No Image</div>"
+        )
+
+        pill = f"<div class='cert-category'>{category}</div>" if category else ""
+
+        cards_html += f"""
+        <div class="cert-card">
+            <div class="cert-thumb-wrap">{thumb}</div>
+            <div class="cert-meta">
+                {pill}
+                <div class="cert-title">{title}</div>
+                <div class="cert-issuer">{issuer} • {date}</div>
+            </div>
+        </div>
+        """
+
+    return f"""
+<style>
+.cert-grid {{
+  display:grid;
+  grid-template-columns:repeat(2,1fr);
+  gap:22px;
+}}
+@media(max-width:900px){{.cert-grid{{grid-template-columns:1fr;}}}}
+.cert-card {{
+  display:flex; gap:16px; padding:16px;
+  border-radius:14px;
+  background:rgba(255,255,255,0.04);
+  border:1px solid rgba(255,255,255,0.08);
+}}
+.cert-thumb{{width:120px;height:120px;object-fit:cover;border-radius:10px;}}
+.cert-thumb-placeholder{{width:120px;height:120px;
+  background:rgba(255,255,255,0.12);
+  display:flex;align-items:center;justify-content:center;
+}}
+.cert-title{{font-weight:700;color:white}}
+.cert-issuer{{font-size:14px;color:#dbeafe}}
+.cert-category {{
+  display:inline-block;
+  margin-bottom:6px;
+  padding:4px 10px;
+  font-size:11px;
+  font-weight:700;
+  border-radius:999px;
+  color:#93c5fd;
+  background:rgba(59,130,246,0.15);
+  border:1px solid rgba(59,130,246,0.3);
+}}
+</style>
+
+<div class="cert-grid">{cards_html}</div>
+"""
@@ -36,6 +36,109 @@ socials = {
     "LinkedIn": "https://www.linkedin.com/in/keerthana-datascience/",
 }
 
+# Internship experience (used in the AI assistant's profile context)
+internships = [
+    {
+        "company": "Zidio Development",
+        "period": "Aug 2025 – Oct 2025",
+        "summary": (
+            "Data Science & Machine Learning Internship involving real-world datasets, "
+            "data preprocessing, and ML pipelines."
+        ),
+    },
+    {
+        "company": "Besant Technologies, Chennai",
+        "period": "",
+        "summary": (
+            "Data Science & AI Internship with hands-on work in Python, SQL, ML models, "
+            "and analytics dashboards."
+        ),
+    },
+]
+
+# Projects (landing page carousel and the AI assistant's profile context)
+PROJECTS = [
+    {
+        "title": "AI Portfolio (This site)",
+        "short_description": "My GenAI portfolio built with Streamlit — RAG demos, projects and docs.",
+        "full_description": "This portfolio showcases my RAG demos, Streamlit apps, and GenAI experiments. Built with Streamlit, custom components and local embeddings.",
+        "tech": ["Streamlit", "Python", "RAG", "LLMOps"],
+        "link": "https://github.com/Keerthana-DS-ghub/Genai-portfolio",
+        "image_url": "images/Portfolio.jpg",
+    },
+    {
+        "title": "AI-Powered RAG Assistant",
+        "short_description": "Context-aware RAG chatbot using LangChain, WatsonX embeddings & ChromaDB.",
+        "full_description": "Developed a fully functional RAG chatbot capable of answering questions from uploaded documents. Integrated IBM WatsonX Embeddings with LangChain and ChromaDB.",
+        "tech": ["LangChain", "IBM WatsonX", "ChromaDB", "Gradio", "Python"],
+        "link": "https://github.com/Keerthana-DS-ghub/AI-Powered-RAG-Assistant-Using-LangChain-and-Gradio",
+        "image_url": "images/Rag.webp",
+    },
+    {
+        "title": "NLP Text Preprocessing Pipeline",
+        "short_description": "Tokenization, normalization, stopword removal, stemming & lemmatization.",
+        "full_description": "Robust text preprocessing pipeline using NLTK / spaCy and Pandas to clean text for downstream tasks.",
+        "tech": ["Python", "NLTK", "spaCy", "Pandas"],
+        "link": "https://github.com/Keerthana-DS-ghub/Text_Preprocessing/blob/main/README.md",
+        "image_url": "images/NLP.png",
+    },
+    {
+        "title": "Time Series Forecasting with ARIMA & SARIMAX",
+        "short_description": "Forecasting with ARIMA/SARIMAX; stationarity & seasonality analysis.",
+        "full_description": "Built forecasting models using ARIMA and SARIMAX for real-world datasets, with ADF tests and decomposition.",
+        "tech": ["Python", "Statsmodels", "Pandas", "Matplotlib"],
+        "link": "https://github.com/Keerthana-DS-ghub/Time-Serie-Arima-Sarimax",
+        "image_url": "images/TimeSeries.jpg",
+    },
+    {
+    "title": "Credit Card Fraud Detection",
+    "short_description": "Machine Learning–based fraud detection on highly imbalanced credit card transaction data.",
+    "full_description": (
+        "Built a fraud detection system using multiple ML models on a highly imbalanced dataset."
+        "Performed EDA, feature scaling, and correlation analysis. "
+        "Handled class imbalance using undersampling, oversampling, and SMOTE. "
+        "Trained and evaluated Logistic Regression, Decision Tree, Random Forest, SVM, and XGBoost models."
+        "Focused on Recall, Precision, F1-score, and ROC-AUC to minimize false negatives in fraud detection."
+    ),
+    "tech": ["Python","Pandas","NumPy","Scikit-learn","Imbalanced-learn","Matplot","XGBoost"],
+    "link": "https://github.com/Keerthana-DS-ghub/Credit_Card_Fraud_Detection",  
+    "image_url": "images/creditcard1.png"
+    },
+
+    {
+        "title": "Real-Time AMFI Mutual Fund Analysis",
+        "short_description": "Automated AMFI NAV ingestion into MySQL and Power BI dashboards.",
+        "full_description": "Automated extraction of AMFI mutual fund data using Python and wrote ingestion scripts to MySQL; visualized in Power BI.",
+        "tech": ["Python", "MySQL", "Power BI"],
+        "link": "https://github.com/Keerthana-DS-ghub/-Real-Time-AMFI-Mutual-Fund-Data-Analysis",
+        "image_url": "images/Amfi.png",
+    },
+    {
+        "title": "Pandas: Hotel Booking Insights",
+        "short_description": "EDA, outlier removal & visualizations for hotel booking data.",
+        "full_description": "Merged datasets, removed outliers (3-sigma) and visualized booking trends to extract user behaviour patterns.",
+        "tech": ["Pandas", "Matplotlib", "Python"],
+        "link": "https://github.com/Keerthana-DS-ghub/Analysing_Hotel_booking",
+        "image_url": "images/HotelBooking.png",
+    },
+    {
+        "title": "SQL Project: Sales Forecast & Revenue Analysis",
+        "short_description": "Multi-table MySQL analysis: forecasting, margin breakdown, deductions.",
+        "full_description": "Multi-table analytics using MySQL covering forecasting, pricing, invoice deductions and manufacturing cost analysis.",
+        "tech": ["MySQL", "SQL", "Power BI"],
+        "link": "https://github.com/Keerthana-DS-ghub/SQL_Project",
+        "image_url": "images/SQL BANNER1.png",
+    },
+    {
+        "title": "Employee Performance Dashboard (Power BI)",
+        "short_description": "HR analytics dashboard: attrition, performance, salary trends (DAX).",
+        "full_description": "Interactive HR analytics dashboard using Power BI and advanced DAX measures.",
+        "tech": ["Power BI", "DAX", "Excel"],
+        "link": "https://github.com/Keerthana-DS-ghub/Employee-Performance-Analysis",
+        "image_url": "images/PowerBI.jpg",
+    },
+]
+
 embed_rss = {
     "enable": False,
     "rss": "",
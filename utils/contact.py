@@ -3,6 +3,10 @@ from html import escape
 import streamlit.components.v1 as components
 import base64
 
+from utils.asset_registry import get_asset_registry
+from utils.fragment_cache import cached_fragment
+from utils.static_assets import image_src
+
 __all__ = ["render_contact_professional"]
 
 ICON_LINKEDIN = "https://cdn-icons-png.flaticon.com/512/3536/3536505.png"
@@ -11,12 +15,15 @@ ICON_MAIL     = "https://cdn-icons-png.flaticon.com/512/732/732200.png"
 
 
 def load_base64(path):
-    """Convert local image file into base64 string for HTML embedding."""
-    try:
-        with open(path, "rb") as f:
-            return base64.b64encode(f.read()).decode()
-    except:
-        return None
+    """Convert local image file into base64 string for HTML embedding (prefer image_src)."""
+    def build():
+        try:
+            with open(path, "rb") as f:
+                return base64.b64encode(f.read()).decode()
+        except OSError:
+            return None
+
+    return get_asset_registry().get(path, None, "base64", build)
 
 
 def _load_defaults():
@@ -28,14 +35,9 @@ def _load_defaults():
         return {}, {}
 
 
-def render_contact_professional(info=None, socials=None, height=330):
-    # Load defaults safely
-    
-    default_info, default_socials = _load_defaults()
-
-    info = info or default_info
-    socials = socials or default_socials
-
+@cached_fragment("contact", sources=("utils/contact.py", "utils/constants.py"))
+def build_contact_html(info, socials):
+    """HTML for the contact card (cached per info/socials)."""
     # Extract fields
 
     name = escape(info.get("name", "Keerthana S"))
@@ -48,14 +50,14 @@ def render_contact_professional(info=None, socials=None, height=330):
 
     initials = "".join([p[0].upper() for p in name.split()][:2])
 
-    # Avatar — Base64 Image
+    # Avatar — 300px derivative, static URL or Base64 (utils.static_assets)
     
     avatar_html = ""
     if photo_path:
-        base64_img = load_base64(photo_path)
-        if base64_img:
+        avatar_uri = image_src(photo_path, "avatar")
+        if avatar_uri != photo_path:
             avatar_html = (
-                f'<img src="data:image/png;base64,{base64_img}" '
+                f'<img src="{avatar_uri}" '
                 f'class="contact-avatar-img"/>'
             )
 
@@ -221,5 +223,15 @@ def render_contact_professional(info=None, socials=None, height=330):
         </div>
     </div>
     """
+    return html
+
+
+def render_contact_professional(info=None, socials=None, height=330):
+    # Load defaults safely
+    
+    default_info, default_socials = _load_defaults()
+
+    info = info or default_info
+    socials = socials or default_socials
 
-    components.html(html, height=height + 10, scrolling=False)
+    components.html(build_contact_html(info, socials), height=height + 10, scrolling=False)
@@ -0,0 +1,170 @@
+# utils/conversation_memory.py
+"""
+Per-session conversation memory for the chat page.
+
+The last CHAT_HISTORY_TURNS completed turns (user question + assistant reply) are
+kept verbatim; older turns are folded into a compact rolling summary. Folding runs in
+a background thread after a reply has been shown, so it never delays an answer; until
+it finishes, the turns waiting to be folded are represented by short extracts.
+Summary plus verbatim turns always stay within CHAT_HISTORY_TOKENS.
+"""
+import os
+import re
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from utils.token_budget import estimate_tokens, truncate_to_tokens
+
+HISTORY_TURNS = int(os.getenv("CHAT_HISTORY_TURNS", "3"))
+HISTORY_TOKEN_CEILING = int(os.getenv("CHAT_HISTORY_TOKENS", "700"))
+SUMMARY_MAX_TOKENS = int(os.getenv("CHAT_SUMMARY_TOKENS", "200"))
+# A single verbatim message never takes more than this
+MESSAGE_MAX_TOKENS = int(os.getenv("CHAT_HISTORY_MESSAGE_TOKENS", "250"))
+
+SUMMARY_INSTRUCTION = (
+    "You maintain a running summary of a recruiter's chat with Keerthana's portfolio assistant.\n"
+    "Merge the new turns into the summary. Keep what was asked and the key facts given "
+    "(projects, skills, dates, contact details). Plain sentences, no greetings, "
+    f"at most {SUMMARY_MAX_TOKENS * 3 // 4} words."
+)
+
+_FOLLOW_UP = re.compile(
+    r"\b(that|this|it|its|those|these|them|above|previous|earlier|same|again|more|further|elaborate|"
+    r"first|second|third|last one|the project|the one)\b"
+)
+
+Turn = Tuple[str, str]
+
+
+def is_follow_up(prompt: str) -> bool:
+    """True when the prompt refers back to earlier turns and cannot be answered on its own."""
+    return bool(_FOLLOW_UP.search((prompt or "").lower()))
+
+
+def _first_sentence(text: str) -> str:
+    text = " ".join((text or "").replace("#", " ").split())
+    m = re.search(r"(?<=[.!?])\s", text)
+    return text[: m.start()] if m else text
+
+
+def extract_turns(turns: List[Turn]) -> List[str]:
+    """One short line per turn; the local stand-in for an LLM summary."""
+    return [
+        f"User asked: {truncate_to_tokens(u, 30)} — answered: {truncate_to_tokens(_first_sentence(a), 40)}"
+        for u, a in turns
+    ]
+
+
+def _fit_newest(lines: List[str], max_tokens: int) -> str:
+    """Join the newest lines that fit in `max_tokens`, oldest dropped first."""
+    kept, used = [], 0
+    for line in reversed(lines):
+        cost = estimate_tokens(line) + 1
+        if used + cost > max_tokens:
+            if max_tokens - used > 20:
+                kept.append(truncate_to_tokens(line, max_tokens - used - 1))
+            break
+        kept.append(line)
+        used += cost
+    return "\n".join(reversed(kept))
+
+
+def summary_request(summary: str, turns: List[Turn]) -> List[Dict[str, str]]:
+    """Chat messages asking the model to fold `turns` into `summary`."""
+    convo = "\n".join(f"User: {u}\nAssistant: {truncate_to_tokens(a, MESSAGE_MAX_TOKENS)}" for u, a in turns)
+    return [
+        {"role": "system", "content": SUMMARY_INSTRUCTION},
+        {"role": "user", "content": f"Summary so far:\n{summary or '(none)'}\n\nNew turns:\n{convo}"},
+    ]
+
+
+class ConversationMemory:
+    """Sliding window of recent turns plus a rolling summary of everything older."""
+
+    def __init__(self, turns: int = HISTORY_TURNS, ceiling: int = HISTORY_TOKEN_CEILING,
+                 summary_tokens: int = SUMMARY_MAX_TOKENS):
+        self.max_turns = max(0, int(turns))
+        self.ceiling = int(ceiling)
+        self.summary_tokens = min(int(summary_tokens), self.ceiling)
+        self._lock = threading.Lock()
+        self._recent: List[Turn] = []
+        self._pending: List[Turn] = []  # dropped out of the window, not yet in the summary
+        self._summary = ""
+        self._generation = 0  # bumped by clear() so a running refresh is discarded
+        self._refreshing = False
+
+    def add_turn(self, user: str, assistant: str):
+        with self._lock:
+            self._recent.append((user, assistant))
+            while len(self._recent) > self.max_turns:
+                self._pending.append(self._recent.pop(0))
+
+    def clear(self):
+        with self._lock:
+            self._recent, self._pending, self._summary = [], [], ""
+            self._generation += 1
+
+    def is_empty(self) -> bool:
+        with self._lock:
+            return not (self._recent or self._pending or self._summary)
+
+    def last_user_prompt(self) -> str:
+        with self._lock:
+            return self._recent[-1][0] if self._recent else ""
+
+    def context(self) -> Tuple[str, List[Dict[str, str]]]:
+        """
+        (summary text, verbatim history messages) for the next call, together within the
+        token ceiling. The newest turns are kept when something has to give.
+        """
+        with self._lock:
+            summary_lines = ([self._summary] if self._summary else []) + extract_turns(self._pending)
+            recent = list(self._recent)
+        summary = _fit_newest(summary_lines, self.summary_tokens)
+        remaining = self.ceiling - estimate_tokens(summary)
+        history: List[Dict[str, str]] = []
+        for user, assistant in reversed(recent):
+            pair = [
+                {"role": "user", "content": truncate_to_tokens(user, MESSAGE_MAX_TOKENS)},
+                {"role": "assistant", "content": truncate_to_tokens(assistant, MESSAGE_MAX_TOKENS)},
+            ]
+            cost = sum(estimate_tokens(m["content"]) for m in pair)
+            if cost > remaining:
+                break
+            history[:0] = pair
+            remaining -= cost
+        return summary, history
+
+    def refresh_async(self, summarize_fn: Callable[[str, List[Turn]], Optional[str]]) -> bool:
+        """
+        Fold pending turns into the summary in a background thread.
+        `summarize_fn(summary, turns)` returns the new summary, or None to fall back to
+        local extracts. Returns True when a refresh was started.
+        """
+        with self._lock:
+            if self._refreshing or not self._pending:
+                return False
+            self._refreshing = True
+            batch, summary, generation = list(self._pending), self._summary, self._generation
+        threading.Thread(
+            target=self._refresh, args=(summarize_fn, summary, batch, generation),
+            name="chat-memory-summary", daemon=True,
+        ).start()
+        return True
+
+    def _refresh(self, summarize_fn, summary, batch, generation):
+        new_summary = None
+        try:
+            new_summary = summarize_fn(summary, batch)
+        except Exception as e:
+            print(f"[conversation_memory] summary refresh failed: {e}")
+        if new_summary:
+            new_summary = truncate_to_tokens(new_summary.strip(), self.summary_tokens)
+        else:
+            new_summary = _fit_newest(([summary] if summary else []) + extract_turns(batch), self.summary_tokens)
+        with self._lock:
+            self._refreshing = False
+            if generation != self._generation:
+                return
+            self._summary = new_summary
+            del self._pending[: len(batch)]
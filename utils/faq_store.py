@@ -0,0 +1,109 @@
+# utils/faq_store.py
+"""
+Precomputed answers for the chat page FAQ.
+
+A background warmup job answers every FAQ entry (bounded concurrency) and stores the
+answers together with the content version they were generated for. Answers are only
+served while that version is current; a new version triggers a fresh warmup.
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Optional
+
+from utils.response_cache import normalize_prompt
+
+WARMUP_CONCURRENCY = int(os.getenv("FAQ_WARMUP_CONCURRENCY", "3"))
+# Seconds before retrying FAQ entries whose generation failed
+WARMUP_RETRY_AFTER = float(os.getenv("FAQ_WARMUP_RETRY_AFTER", "300"))
+
+
+class FAQStore:
+    """Process-wide FAQ answer store shared by all sessions."""
+
+    def __init__(self, max_workers: int = WARMUP_CONCURRENCY):
+        self.max_workers = max(1, int(max_workers))
+        self._lock = threading.Lock()
+        self._answers: Dict[str, str] = {}
+        self._version: Optional[str] = None
+        self._warming: Optional[str] = None  # version currently being generated
+        self._total = 0
+        self._finished_at = 0.0
+
+    def get(self, prompt: str, version: str) -> Optional[str]:
+        """Return the stored answer for `prompt` if it was generated for `version`."""
+        with self._lock:
+            if self._version != version:
+                return None
+            return self._answers.get(normalize_prompt(prompt))
+
+    def status(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "version": self._version,
+                "ready": len(self._answers),
+                "total": self._total,
+                "warming": self._warming is not None,
+            }
+
+    def ensure_warm(self, questions: Iterable[str], version: str, answer_fn: Callable[[str], Optional[str]]) -> bool:
+        """
+        Start a background warmup for `version` unless it is current or already running.
+        `answer_fn(question)` returns the answer text, or None when generation failed.
+        Returns True when a new job was started.
+        """
+        questions = list(questions)
+        with self._lock:
+            if self._warming == version:
+                return False
+            if self._version == version:
+                if len(self._answers) >= len(questions):
+                    return False
+                if time.time() - self._finished_at < WARMUP_RETRY_AFTER:
+                    return False
+            if self._version != version:
+                # Answers for an older version must never be served again
+                self._answers = {}
+                self._version = version
+            self._warming = version
+            self._total = len(questions)
+            pending = [q for q in questions if normalize_prompt(q) not in self._answers]
+        threading.Thread(
+            target=self._warm, args=(pending, version, answer_fn), name="faq-warmup", daemon=True
+        ).start()
+        return True
+
+    def _warm(self, questions, version, answer_fn):
+        def work(q):
+            try:
+                text = answer_fn(q)
+            except Exception as e:
+                print(f"[faq_store] warmup failed for {q!r}: {e}")
+                text = None
+            if text:
+                with self._lock:
+                    if self._version == version:
+                        self._answers[normalize_prompt(q)] = text
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="faq-warmup") as pool:
+                list(pool.map(work, questions))
+        finally:
+            with self._lock:
+                if self._warming == version:
+                    self._warming = None
+                    self._finished_at = time.time()
+
+
+_store: Optional[FAQStore] = None
+_store_lock = threading.Lock()
+
+
+def get_faq_store() -> FAQStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = FAQStore()
+    return _store
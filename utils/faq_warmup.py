@@ -0,0 +1,68 @@
+# utils/faq_warmup.py
+"""
+The chat page FAQ and the background job that precomputes its answers.
+
+serve.py calls warm_faq() from its lifespan hook, so the answers are generated when
+the server starts instead of when the first visitor opens the chat page. The chat
+page calls it as well; that call is a no-op while the stored answers match the
+current profile version (or are being generated) and restarts the job after a
+profile edit. Questions the intent router answers locally never reach the model.
+"""
+from typing import List, Optional
+
+from utils.faq_store import get_faq_store
+from utils.intent_router import OTHER, get_intent_router
+from utils.llm_scheduler import PRIORITY_BACKGROUND, get_scheduler
+from utils.profile_store import get_profile_store
+from utils.prompt_builder import get_compiled_prompt, system_instruction_for
+from utils.response_cache import content_version
+from utils.response_parser import extract_text
+from utils.semantic_cache import SEMANTIC_CACHE_ENABLED, get_semantic_cache
+from utils.token_budget import generation_params
+from utils.watsonx_client import DEPLOYMENT_ID, IBM_APIKEY, ML_BASE, infer_with_system_messages
+
+FAQ = [
+    "What are her strengths and weaknesses?",
+    "What is her expected salary?",
+    "What is her latest project?",
+    "When can she start work?",
+    "Tell me about her professional background.",
+    "What is her skillset?",
+    "What is her contact information?",
+    "What are her achievements?"
+]
+
+
+def system_instruction() -> str:
+    """Compiled system instruction for the current profile snapshot."""
+    return get_compiled_prompt(get_profile_store().profile).instruction
+
+
+def upstream_faq() -> List[str]:
+    """FAQ entries that need a model answer (the rest are routed locally)."""
+    router = get_intent_router()
+    return [q for q in FAQ if router.classify(q).intent == OTHER]
+
+
+def answer_faq(question: str) -> Optional[str]:
+    """Generate one FAQ answer (runs in the background warmup job)."""
+    instruction = system_instruction()
+    with get_scheduler().slot("faq-warmup", priority=PRIORITY_BACKGROUND):
+        result = infer_with_system_messages([
+            {"role": "system", "content": system_instruction_for(question, instruction)},
+            {"role": "user", "content": question},
+        ], params=generation_params(question))
+    if not result.get("ok"):
+        return None
+    answer = extract_text(result.get("json"))
+    if answer and SEMANTIC_CACHE_ENABLED:
+        # Paraphrased FAQ questions ("what's her tech stack?") reuse the warmed answer
+        get_semantic_cache().put(question, content_version(instruction), answer)
+    return answer
+
+
+def warm_faq() -> bool:
+    """Start the warmup for the current profile version unless it is done or running."""
+    if not (IBM_APIKEY and ML_BASE and DEPLOYMENT_ID):
+        return False
+    return get_faq_store().ensure_warm(upstream_faq(), content_version(system_instruction()), answer_faq)
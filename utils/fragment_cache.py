@@ -0,0 +1,124 @@
+# utils/fragment_cache.py
+"""
+Compiled HTML fragments for the landing page sections, shared by all sessions.
+
+@cached_fragment(name, sources=...) wraps a function that builds a section's HTML.
+The result is cached under a key made of the section name, a fingerprint of the call
+arguments, a content hash of the `sources` modules (the data and the code that renders
+it), the images/ directory state and the image asset mode, so a rerun with unchanged
+inputs returns the stored string without escaping or concatenating anything.
+"""
+import functools
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+from utils.response_cache import ROOT, PROFILE_STAT_INTERVAL, profile_version
+from utils.static_assets import asset_mode
+
+FRAGMENT_CACHE_MAX_ENTRIES = int(os.getenv("FRAGMENT_CACHE_MAX_ENTRIES", "64"))
+IMAGE_DIR = ROOT / "images"
+
+_images_memo: Tuple[float, str] = (0.0, "")
+
+
+def images_version() -> str:
+    """Hash of names, sizes and mtimes under images/ (re-stat'ed at most every PROFILE_STAT_INTERVAL)."""
+    global _images_memo
+    now = time.monotonic()
+    if _images_memo[1] and now - _images_memo[0] < PROFILE_STAT_INTERVAL:
+        return _images_memo[1]
+    h = hashlib.sha1()
+    try:
+        for entry in sorted(os.scandir(IMAGE_DIR), key=lambda e: e.name):
+            st = entry.stat()
+            h.update(f"{entry.name}:{st.st_size}:{st.st_mtime_ns};".encode("utf-8"))
+    except OSError:
+        pass
+    version = h.hexdigest()[:16]
+    _images_memo = (now, version)
+    return version
+
+
+def fingerprint(args, kwargs) -> str:
+    raw = json.dumps([args, kwargs], sort_keys=True, default=repr, ensure_ascii=False)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class FragmentCache:
+    """Thread-safe LRU of compiled HTML strings."""
+
+    def __init__(self, max_entries: int = FRAGMENT_CACHE_MAX_ENTRIES):
+        self.max_entries = max(1, int(max_entries))
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            html = self._entries.get(key)
+            if html is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return html
+
+    def put(self, key: str, html: str):
+        with self._lock:
+            self._entries[key] = html
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": sum(len(v) for v in self._entries.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+# --- Process-wide instance shared by all sessions ---
+_cache: Optional[FragmentCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_fragment_cache() -> FragmentCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = FragmentCache(FRAGMENT_CACHE_MAX_ENTRIES)
+    return _cache
+
+
+def cached_fragment(name: str, sources: Tuple[str, ...] = ()) -> Callable:
+    """Cache an HTML-building function per argument set and version of `sources`."""
+    def decorator(build: Callable[..., str]) -> Callable[..., str]:
+        @functools.wraps(build)
+        def wrapper(*args, **kwargs) -> str:
+            key = "|".join((
+                name, profile_version(sources), images_version(), asset_mode(), fingerprint(args, kwargs),
+            ))
+            cache = get_fragment_cache()
+            html = cache.get(key)
+            if html is None:
+                html = build(*args, **kwargs)
+                cache.put(key, html)
+            return html
+
+        wrapper.uncached = build
+        return wrapper
+    return decorator
@@ -4,6 +4,8 @@ import streamlit as st
 from PIL import Image
 import html as _html
 
+from utils.image_derivatives import derivative_path
+
 # ---------------- Animated About Text ----------------
 def build_animated_text(text: str, font_size: int = 22, step: float = 0.06):
     """Return HTML for word-by-word fade-in animated paragraph."""
@@ -118,7 +120,7 @@ def render_hero(info, socials):
     # Vertical alignment spacer to match centered hero text
         st.markdown("<div style='height:48px'></div>", unsafe_allow_html=True)
         try:
-            st.image(photo, width=420)
+            st.image(derivative_path(photo, "hero"), width=420)
         except Exception:
             try:
                 img = Image.open(photo)
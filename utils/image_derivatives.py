@@ -0,0 +1,209 @@
+# utils/image_derivatives.py
+"""
+Size-appropriate derivatives of the images in images/.
+
+The originals are multi-megabyte PNGs shown at 120-420 px. Each render site asks for a
+named variant (VARIANTS) and gets a resized, recompressed copy (WebP, or optimized
+PNG/JPEG when Pillow has no WebP support). Derivatives are named after a hash of the
+source bytes and the variant spec, cached on disk under IMAGE_CACHE_DIR, and built in
+a process pool when several are missing at once (first render after a deploy).
+
+Any failure falls back to the original file, so a broken image never breaks a page.
+"""
+import base64
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from utils.asset_registry import get_asset_registry
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:  # derivatives are an optimisation; originals are served without Pillow
+    Image = None
+
+CACHE_DIR = Path(os.getenv("IMAGE_CACHE_DIR", str(Path(__file__).resolve().parent.parent / ".cache" / "images")))
+WORKERS = int(os.getenv("IMAGE_WORKERS", str(min(4, os.cpu_count() or 1))))
+WEBP_QUALITY = int(os.getenv("IMAGE_WEBP_QUALITY", "80"))
+JPEG_QUALITY = int(os.getenv("IMAGE_JPEG_QUALITY", "82"))
+
+# name -> (width, height, crop). crop=True centre-crops to exactly width x height
+# (matches object-fit: cover); otherwise the image is scaled to fit inside the box.
+VARIANTS: Dict[str, Tuple[int, int, bool]] = {
+    "cert_thumb": (120, 120, True),     # certificate grid, 120x120 cover
+    "card": (340, 160, True),           # glass project grid thumbnail
+    "carousel": (520, 280, True),       # project carousel media
+    "avatar": (300, 300, False),        # contact card and chat page photo
+    "hero": (420, 840, False),          # landing hero photo (st.image width=420)
+}
+
+MIME = {".png": "image/png", ".jpg": "image/jpeg", ".jpeg": "image/jpeg", ".webp": "image/webp", ".gif": "image/gif"}
+
+
+def _has_alpha(im) -> bool:
+    return im.mode in ("RGBA", "LA", "PA") or (im.mode == "P" and "transparency" in im.info)
+
+
+def _output_format(has_alpha: bool) -> Tuple[str, str]:
+    if features.check("webp"):
+        return "WEBP", ".webp"
+    return ("PNG", ".png") if has_alpha else ("JPEG", ".jpg")
+
+
+def _target_path(src: Path, variant: str) -> Path:
+    w, h, crop = VARIANTS[variant]
+    digest = hashlib.sha1(src.read_bytes())
+    digest.update(f"{variant}:{w}x{h}:{crop}:{WEBP_QUALITY}:{JPEG_QUALITY}".encode())
+    with Image.open(src) as im:  # lazy: reads the header only
+        _, ext = _output_format(_has_alpha(im))
+    stem = "".join(ch if ch.isalnum() else "_" for ch in src.stem)
+    return CACHE_DIR / f"{stem}-{variant}-{digest.hexdigest()[:16]}{ext}"
+
+
+def _build(src: str, variant: str, target: str) -> str:
+    """Write one derivative (runs in worker processes). Returns the written path."""
+    w, h, crop = VARIANTS[variant]
+    with Image.open(src) as im:
+        im = ImageOps.exif_transpose(im)
+        has_alpha = _has_alpha(im)
+        im = im.convert("RGBA" if has_alpha else "RGB")
+        if crop:
+            if im.width > w or im.height > h:
+                im = ImageOps.fit(im, (w, h), Image.LANCZOS)
+        else:
+            im.thumbnail((w, h), Image.LANCZOS)
+        fmt, _ = _output_format(has_alpha)
+        out = Path(target)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        tmp = out.with_name(f".{out.name}.{os.getpid()}.tmp")
+        if fmt == "WEBP":
+            im.save(tmp, fmt, quality=WEBP_QUALITY, method=4)
+        elif fmt == "JPEG":
+            im.save(tmp, fmt, quality=JPEG_QUALITY, optimize=True, progressive=True)
+        else:
+            im.save(tmp, fmt, optimize=True)
+        os.replace(tmp, out)  # atomic: concurrent builders never expose a partial file
+    return str(out)
+
+
+def resolve_source(rel_path: str) -> Optional[Path]:
+    """Local file for a path relative to the working directory (or absolute); None otherwise."""
+    if not rel_path or rel_path.startswith(("data:", "http://", "https://")):
+        return None
+    p = Path(os.getcwd()) / rel_path
+    if p.is_file():
+        return p
+    p = Path(rel_path)
+    return p if p.is_file() else None
+
+
+def ensure_derivatives(paths: Iterable[str], variant: str) -> Dict[str, Path]:
+    """
+    Make sure the `variant` derivative of every local image in `paths` exists.
+    Returns {path: derivative path}; paths that are remote, missing or fail to convert
+    are left out. Missing derivatives are built in a process pool when there are several.
+    """
+    if Image is None or variant not in VARIANTS:
+        return {}
+    registry = get_asset_registry()  # remembers derivative paths so sources are hashed once
+    out: Dict[str, Path] = {}
+    todo: List[Tuple[str, Path, Path]] = []
+    for rel in dict.fromkeys(p for p in paths if p):
+        src = resolve_source(rel)
+        if src is None:
+            continue
+        known = registry.lookup(src, variant, "derivative")
+        if known is not None and Path(known).exists():
+            out[rel] = Path(known)
+            continue
+        try:
+            target = _target_path(src, variant)
+        except Exception:  # unreadable or not an image
+            continue
+        if target.exists():
+            registry.store(src, variant, "derivative", str(target))
+            out[rel] = target
+        else:
+            todo.append((rel, src, target))
+
+    if not todo:
+        return out
+
+    built: List[Optional[str]] = []
+    if len(todo) > 1 and WORKERS > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=min(WORKERS, len(todo))) as pool:
+                futures = [pool.submit(_build, str(src), variant, str(target)) for _, src, target in todo]
+                for f in futures:
+                    try:
+                        built.append(f.result())
+                    except Exception as e:
+                        print(f"[image_derivatives] build failed: {e}")
+                        built.append(None)
+        except Exception as e:  # no process support (sandbox, frozen app): build inline
+            print(f"[image_derivatives] process pool unavailable, building inline: {e}")
+            built = []
+    if not built:
+        for _, src, target in todo:
+            try:
+                built.append(_build(str(src), variant, str(target)))
+            except Exception as e:
+                print(f"[image_derivatives] build failed for {src}: {e}")
+                built.append(None)
+
+    for (rel, src, _), path in zip(todo, built):
+        if path:
+            registry.store(src, variant, "derivative", path)
+            out[rel] = Path(path)
+    return out
+
+
+def derivative_path(rel_path: str, variant: str) -> str:
+    """Path of the `variant` derivative of a local image, or `rel_path` unchanged."""
+    found = ensure_derivatives([rel_path], variant).get(rel_path)
+    return str(found) if found is not None else rel_path
+
+
+def image_data_uri(rel_path: str, variant: Optional[str] = None) -> str:
+    """
+    Data URI for a local image, using its `variant` derivative when one can be built.
+    Remote URLs and data URIs pass through; unreadable paths come back unchanged.
+    """
+    if not rel_path or rel_path.startswith(("data:", "http://", "https://")):
+        return rel_path or ""
+    src = resolve_source(rel_path)
+    if src is None:
+        return rel_path
+
+    def build() -> Optional[str]:
+        p = Path(derivative_path(str(src), variant)) if variant else src
+        mime = MIME.get(p.suffix.lower())
+        if not mime:
+            return None
+        try:
+            return f"data:{mime};base64,{base64.b64encode(p.read_bytes()).decode('ascii')}"
+        except OSError:
+            return None
+
+    return get_asset_registry().get(src, variant, "data_uri", build) or rel_path
+
+
+if __name__ == "__main__":
+    # Pre-build every derivative the pages use (e.g. at image build time)
+    from utils.certificates import certificates
+    from utils.constants import PROJECTS, info
+
+    project_images = [p.get("image_url") or p.get("image") for p in PROJECTS]
+    jobs = {
+        "cert_thumb": [c.get("image") for c in certificates],
+        "card": project_images,
+        "carousel": project_images,
+        "avatar": [info.get("ProfileImage"), "images/profile3.png"],
+        "hero": [info.get("ProfileImage")],
+    }
+    for name, paths in jobs.items():
+        made = ensure_derivatives(paths, name)
+        size = sum(p.stat().st_size for p in made.values())
+        print(f"{name:<11} {len(made)} file(s), {size / 1024:.1f} KiB")
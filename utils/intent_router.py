@@ -0,0 +1,246 @@
+# utils/intent_router.py
+"""
+Local intent router for the chat assistant.
+
+Greetings, contact requests, availability and salary questions have fixed answers
+(see ASSISTANT_RULES), so they are answered here from the ProfileStore snapshot (email
+and socials from utils.constants, availability from profile.json) instead of a watsonx
+round trip; hot-reloaded profile edits show up in the next answer. Two signals decide:
+
+- keyword rules anchored to how the intent is asked ("her email", "when can she start",
+  "expected package"), so "email spam classifier" or "package management" never match
+- a small nearest-centroid classifier over hashed character n-grams, trained on
+  TRAINING_EXAMPLES at first use (NumPy only, microseconds per prompt)
+
+A prompt is routed when it is short, matches at most one intent rule and the model
+predicts the same intent with at least ROUTER_RULE_MIN_SCORE (or, without a rule hit,
+the model is confident: ROUTER_MIN_SCORE). When in doubt the prompt goes upstream.
+Every decision is counted; stats() shows how much traffic was kept local.
+"""
+import functools
+import os
+import re
+import threading
+import zlib
+from collections import Counter
+from typing import Dict, List, Mapping, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from utils.profile_store import ProfileSnapshot
+from utils.response_cache import normalize_prompt
+
+ROUTER_ENABLED = os.getenv("INTENT_ROUTER", "1").lower() not in ("0", "false", "no")
+ROUTER_MAX_WORDS = int(os.getenv("INTENT_ROUTER_MAX_WORDS", "12"))
+ROUTER_MIN_SCORE = float(os.getenv("INTENT_ROUTER_MIN_SCORE", "0.45"))
+ROUTER_RULE_MIN_SCORE = float(os.getenv("INTENT_ROUTER_RULE_MIN_SCORE", "0.25"))
+FEATURE_DIM = 1 << 12
+NGRAM_RANGE = (2, 4)
+
+OTHER = "other"
+INTENTS = ("greeting", "contact", "availability", "salary")
+
+RULES = {
+    "greeting": re.compile(
+        r"^(hi+|hello+|hey+|hiya|greetings|howdy|yo|good (morning|afternoon|evening|day)|namaste|vanakkam)"
+        r"( there| all| everyone| keerthana| bot| assistant)?( how are you)?$"
+    ),
+    "contact": re.compile(
+        r"\b(contact (her|keerthana|details|info|information)|(how|where) (can|do|to) (i |we )?(contact|reach|connect with) her"
+        r"|reach (out to )?(her|keerthana)|get in touch"
+        r"|her (contact|email|e mail|mail id|linkedin|phone|mobile)(?= (address|id|number|profile|url|handle|details|info)\b|$)"
+        r"|email (address|id)|linkedin (profile|url|id|handle)|phone number)\b"
+    ),
+    "availability": re.compile(
+        r"\b((when|how soon) can she (start|join)|can she (start|join) (immediately|soon|now|right away)|is she available"
+        r"|available (to (start|join|work)|from|for work|immediately)|her availability|notice period|(start|join(ing)?) date)\b"
+    ),
+    "salary": re.compile(
+        r"\b(her (expected |current )?(salary|ctc|compensation|pay|package|remuneration)(?! \w+ (analysis|model|prediction|data))"
+        r"|salary (expectations?|range|expected)|(expected|current) (salary|ctc|pay|package|compensation)"
+        r"|what compensation (does|would|will) she (expect|want|ask)|pay (range|expectations?)"
+        r"|(want|expect|like) to be paid)\b"
+    ),
+}
+
+TRAINING_EXAMPLES: Dict[str, Tuple[str, ...]] = {
+    "greeting": (
+        "hi", "hello", "hey", "hey there", "hello there", "hi keerthana", "good morning", "good afternoon",
+        "good evening", "hiya", "greetings", "howdy", "hi how are you", "hello assistant", "hey bot",
+    ),
+    "contact": (
+        "what is her contact information", "how can i contact her", "how do i reach keerthana",
+        "what is her email", "can i get her email address", "share her linkedin", "linkedin profile",
+        "how can i get in touch with her", "contact details please", "her email id", "how to reach out to her",
+        "where can i connect with her",
+    ),
+    "availability": (
+        "when can she start work", "when can she join", "is she available", "what is her availability",
+        "what is her notice period", "how soon can she start", "can she join immediately",
+        "is she open to new roles", "when is she available to start", "earliest joining date",
+    ),
+    "salary": (
+        "what is her expected salary", "salary expectations", "what compensation does she expect",
+        "what is her current ctc", "her ctc", "expected package", "how much does she want to be paid",
+        "what pay range is she looking for", "salary range", "what are her pay expectations",
+    ),
+    OTHER: (
+        "what are her skills", "tell me about her projects", "what is her latest project",
+        "tell me about her professional background", "what are her strengths and weaknesses",
+        "what are her achievements", "does she know python", "what certifications does she have",
+        "explain her rag project", "what did she do in her internship", "is she good at machine learning",
+        "what tools does she use", "summarize her experience", "what is llmops", "why should we hire her",
+        "which cloud platforms has she used", "tell me more about that", "what is her education",
+        "hi can you tell me about her projects", "hello what are her skills",
+    ),
+}
+
+# The profile states no availability unless profile.json sets one: never guess a date
+AVAILABILITY_UNSTATED = (
+    "{name}'s availability and start date aren't listed in her profile — "
+    "please reach out to her directly:"
+)
+SALARY_ANSWER = (
+    "{name} prefers to discuss compensation directly with the hiring team. She is looking for a "
+    "market-aligned package for the role, and values learning, growth and impactful GenAI work."
+)
+GREETING_ANSWER = (
+    "Hi! 👋 I'm {name}'s portfolio assistant. Ask me about her skills, projects, internship "
+    "experience, certifications, availability or how to get in touch."
+)
+
+
+class Route(NamedTuple):
+    intent: str
+    score: float
+    reason: str
+
+
+def _words(text: str) -> List[str]:
+    return text.split()
+
+
+def hash_features(text: str, dim: int = FEATURE_DIM, ngram_range: Tuple[int, int] = NGRAM_RANGE) -> np.ndarray:
+    """L2-normalized bag of hashed character n-grams (plus whole words) of a normalized text."""
+    vec = np.zeros(dim, dtype=np.float32)
+    padded = f" {text} "
+    lo, hi = ngram_range
+    for n in range(lo, hi + 1):
+        for i in range(len(padded) - n + 1):
+            vec[zlib.crc32(padded[i:i + n].encode("utf-8")) % dim] += 1.0
+    for word in _words(text):
+        vec[zlib.crc32(b"w:" + word.encode("utf-8")) % dim] += 1.0
+    norm = float(np.linalg.norm(vec))
+    return vec / norm if norm else vec
+
+
+def contact_lines(data: Mapping) -> List[str]:
+    """Email and social links from a snapshot's source data, one "Label: value" per item."""
+    info = data.get("info") or {}
+    lines = [f"Email: {info['Email']}"] if info.get("Email") else []
+    lines += [f"{label}: {url}" for label, url in (data.get("socials") or {}).items() if url]
+    return lines
+
+
+class IntentRouter:
+    """Keyword rules + nearest-centroid model; answers deterministic intents locally."""
+
+    def __init__(self, examples: Mapping[str, Tuple[str, ...]] = TRAINING_EXAMPLES):
+        self._lock = threading.Lock()
+        self.labels: Tuple[str, ...] = tuple(examples)
+        rows = {label: np.stack([hash_features(normalize_prompt(t)) for t in examples[label]]) for label in self.labels}
+        # IDF weights, so phrasing every question shares ("what is her") carries little signal
+        docs = np.concatenate(list(rows.values()))
+        df = np.count_nonzero(docs, axis=0)
+        self._idf = (np.log((1 + len(docs)) / (1 + df)) + 1.0).astype(np.float32)
+        centroids = []
+        for label in self.labels:
+            mean = np.mean([self._weigh(v) for v in rows[label]], axis=0)
+            centroids.append(mean / (np.linalg.norm(mean) or 1.0))
+        self._centroids = np.stack(centroids)
+        self.decisions: Counter = Counter()
+        # FAQ chips and the warmup filter ask the same questions on every rerun
+        self.classify = functools.lru_cache(maxsize=1024)(self.classify)
+
+    def _weigh(self, vec: np.ndarray) -> np.ndarray:
+        vec = vec * self._idf
+        norm = float(np.linalg.norm(vec))
+        return vec / norm if norm else vec
+
+    def predict(self, normalized: str) -> Tuple[str, float]:
+        scores = self._centroids @ self._weigh(hash_features(normalized))
+        best = int(np.argmax(scores))
+        return self.labels[best], float(scores[best])
+
+    def classify(self, prompt: str) -> Route:
+        """Route for `prompt` (intent OTHER means: send upstream)."""
+        text = normalize_prompt(prompt)
+        if not text:
+            return Route(OTHER, 0.0, "empty")
+        if len(_words(text)) > ROUTER_MAX_WORDS:
+            return Route(OTHER, 0.0, "long")
+        hits = [intent for intent in INTENTS if RULES[intent].search(text)]
+        if len(hits) > 1:
+            return Route(OTHER, 0.0, "mixed")
+        label, score = self.predict(text)
+        if hits:
+            if label == hits[0] and score >= ROUTER_RULE_MIN_SCORE:
+                return Route(hits[0], score, "rule")
+            return Route(OTHER, score, "model_disagrees" if label != hits[0] else "low_confidence")
+        if label != OTHER and score >= ROUTER_MIN_SCORE:
+            return Route(label, score, "model")
+        return Route(OTHER, score, "open_ended")
+
+    def route(self, prompt: str, snapshot: ProfileSnapshot) -> Optional[str]:
+        """Local answer for a deterministic intent, or None to call the model. Counts the decision."""
+        if not ROUTER_ENABLED:
+            return None
+        decision = self.classify(prompt)
+        with self._lock:
+            self.decisions[decision.intent] += 1
+            self.decisions[f"reason:{decision.reason}"] += 1
+        if decision.intent == OTHER:
+            return None
+        return self.answer(decision.intent, snapshot)
+
+    @staticmethod
+    def answer(intent: str, snapshot: ProfileSnapshot) -> Optional[str]:
+        """Local answer for `intent` from the snapshot, or None when the profile has no data for it."""
+        profile = snapshot.profile
+        name = (profile.get("name") or "Keerthana").strip()
+        contacts = contact_lines(snapshot.data)
+        if intent == "greeting":
+            return GREETING_ANSWER.format(name=name)
+        if intent == "contact":
+            return "\n\n".join(contacts) or None
+        if intent == "availability":
+            text = profile.get("availability") or AVAILABILITY_UNSTATED.format(name=name)
+            return "\n\n".join([text] + contacts)
+        return SALARY_ANSWER.format(name=name)
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            routed = sum(self.decisions[i] for i in INTENTS)
+            total = routed + self.decisions[OTHER]
+            return {
+                "total": total,
+                "routed": routed,
+                "upstream": self.decisions[OTHER],
+                "local_ratio": round(routed / total, 3) if total else 0.0,
+                "by_intent": {i: self.decisions[i] for i in INTENTS},
+                "by_reason": {k.split(":", 1)[1]: v for k, v in self.decisions.items() if k.startswith("reason:")},
+            }
+
+
+# --- Process-wide instance shared by all sessions ---
+_router: Optional[IntentRouter] = None
+_router_lock = threading.Lock()
+
+
+def get_intent_router() -> IntentRouter:
+    global _router
+    if _router is None:
+        with _router_lock:
+            if _router is None:
+                _router = IntentRouter(TRAINING_EXAMPLES)
+    return _router
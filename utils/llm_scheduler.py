@@ -0,0 +1,177 @@
+# utils/llm_scheduler.py
+"""
+Process-wide admission control for upstream LLM calls.
+
+At most LLM_MAX_CONCURRENCY calls run at once. Further callers wait in a bounded queue
+(LLM_QUEUE_MAX); when it is full they are rejected immediately with SchedulerBusy.
+The next caller is picked by priority first (short requests jump ahead of normal ones,
+background work goes last), then by how many requests its session has already had
+served, so one busy session cannot starve the others. Requests from the same session
+stay in FIFO order.
+"""
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+QUEUE_MAX = int(os.getenv("LLM_QUEUE_MAX", "32"))
+QUEUE_TIMEOUT = float(os.getenv("LLM_QUEUE_TIMEOUT", "45"))
+# Prompts up to this many characters count as short and may jump the queue
+SHORT_PROMPT_CHARS = int(os.getenv("LLM_SHORT_PROMPT_CHARS", "80"))
+
+PRIORITY_SHORT = 0
+PRIORITY_NORMAL = 1
+PRIORITY_BACKGROUND = 2
+
+
+class SchedulerBusy(Exception):
+    """Raised when the wait queue is full or the wait exceeded its timeout."""
+
+
+def priority_for_prompt(prompt: str) -> int:
+    return PRIORITY_SHORT if len(prompt or "") <= SHORT_PROMPT_CHARS else PRIORITY_NORMAL
+
+
+class _Ticket:
+    __slots__ = ("session_id", "priority", "seq", "enqueued", "granted")
+
+    def __init__(self, session_id: str, priority: int, seq: int):
+        self.session_id = session_id
+        self.priority = priority
+        self.seq = seq
+        self.enqueued = time.perf_counter()
+        self.granted = False
+
+
+class LLMScheduler:
+    def __init__(self, max_concurrency: int = MAX_CONCURRENCY, max_queue: int = QUEUE_MAX):
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.max_queue = max(0, int(max_queue))
+        self._cond = threading.Condition()
+        self._waiting: List[_Ticket] = []
+        self._in_flight = 0
+        self._served: Dict[str, int] = {}
+        self._seq = itertools.count()
+        self._stats = {"admitted": 0, "rejected": 0, "timeouts": 0,
+                       "wait_seconds_total": 0.0, "wait_seconds_max": 0.0}
+
+    # --- ordering ---
+    def _order(self) -> List[_Ticket]:
+        """Waiting tickets in grant order; only each session's oldest ticket competes."""
+        heads: Dict[str, _Ticket] = {}
+        rest: List[_Ticket] = []
+        for t in sorted(self._waiting, key=lambda t: t.seq):
+            if t.session_id in heads:
+                rest.append(t)
+            else:
+                heads[t.session_id] = t
+        ranked = sorted(heads.values(), key=lambda t: (t.priority, self._served.get(t.session_id, 0), t.seq))
+        return ranked + sorted(rest, key=lambda t: (t.priority, t.seq))
+
+    def _grant_next(self):
+        while self._in_flight < self.max_concurrency and self._waiting:
+            ticket = self._order()[0]
+            self._waiting.remove(ticket)
+            self._admit(ticket)
+        if not self._waiting:
+            # Fairness only matters under contention; forget served counts once the queue drains
+            self._served.clear()
+        self._cond.notify_all()
+
+    def _admit(self, ticket: _Ticket):
+        ticket.granted = True
+        self._in_flight += 1
+        self._served[ticket.session_id] = self._served.get(ticket.session_id, 0) + 1
+        waited = time.perf_counter() - ticket.enqueued
+        self._stats["admitted"] += 1
+        self._stats["wait_seconds_total"] += waited
+        self._stats["wait_seconds_max"] = max(self._stats["wait_seconds_max"], waited)
+
+    # --- public API ---
+    @contextmanager
+    def slot(self, session_id: str, priority: int = PRIORITY_NORMAL, timeout: float = QUEUE_TIMEOUT,
+             on_position: Optional[Callable[[int], None]] = None):
+        """
+        Hold one upstream-call slot for the duration of the block.
+        `on_position(n)` is called while waiting whenever the 1-based queue position changes.
+        """
+        self.acquire(session_id, priority, timeout, on_position)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def acquire(self, session_id: str, priority: int = PRIORITY_NORMAL, timeout: float = QUEUE_TIMEOUT,
+                on_position: Optional[Callable[[int], None]] = None):
+        with self._cond:
+            ticket = _Ticket(session_id, priority, next(self._seq))
+            if self._in_flight < self.max_concurrency and not self._waiting:
+                self._admit(ticket)
+                return
+            if len(self._waiting) >= self.max_queue:
+                self._stats["rejected"] += 1
+                raise SchedulerBusy("The assistant is busy right now.")
+            self._waiting.append(ticket)
+            self._grant_next()
+            deadline = time.monotonic() + timeout
+            last_pos = None
+            while not ticket.granted:
+                pos = self._order().index(ticket) + 1
+                if on_position is not None and pos != last_pos:
+                    last_pos = pos
+                    self._cond.release()
+                    try:
+                        on_position(pos)
+                    except Exception:
+                        pass
+                    finally:
+                        self._cond.acquire()
+                    continue
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    if not ticket.granted:
+                        self._waiting.remove(ticket)
+                        self._stats["timeouts"] += 1
+                        self._cond.notify_all()
+                        raise SchedulerBusy("Timed out waiting for a free slot.")
+                    break
+                self._cond.wait(min(remaining, 0.5))
+
+    def release(self):
+        with self._cond:
+            self._in_flight = max(0, self._in_flight - 1)
+            self._grant_next()
+
+    def queue_position(self, session_id: str) -> int:
+        """1-based position of the session's first waiting request (0 when not queued)."""
+        with self._cond:
+            for i, t in enumerate(self._order()):
+                if t.session_id == session_id:
+                    return i + 1
+        return 0
+
+    def stats(self) -> Dict[str, float]:
+        with self._cond:
+            out = dict(self._stats)
+            out["queue_depth"] = len(self._waiting)
+            out["in_flight"] = self._in_flight
+            out["max_concurrency"] = self.max_concurrency
+            out["max_queue"] = self.max_queue
+        out["wait_seconds_avg"] = out["wait_seconds_total"] / out["admitted"] if out["admitted"] else 0.0
+        return out
+
+
+_scheduler: Optional[LLMScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> LLMScheduler:
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = LLMScheduler()
+    return _scheduler
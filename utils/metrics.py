@@ -0,0 +1,237 @@
+# utils/metrics.py
+"""
+Process-wide metrics for the chat pipeline, rendered in Prometheus text format.
+
+- chat_stage_seconds{stage}: latency histogram per pipeline stage (IAM token, message
+  normalization, HTTP call, JSON decode, prompt build, queue wait, extract_text, ...)
+- watsonx_requests_total{endpoint,status} and watsonx_errors_total{status}
+- watsonx_tokens_total{kind}: prompt/completion tokens from the response `usage` block
+- chat_replies_total{source} and chat_reply_seconds{source}: where replies came from
+  (router, faq, cache, semantic, model, error, busy) and how long they took
+- gauges from the stats() of the shared caches, router, scheduler and single-flight
+  registry, for the ones the process has loaded
+
+Recording is a perf_counter pair, a bisect and a short lock (2-4 us per stage), so it
+stays on in production; METRICS_ENABLED=0 turns it into a no-op. serve.py exposes
+render_prometheus() at /metrics.
+"""
+import hmac
+import ipaddress
+import math
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1").lower() not in ("0", "false", "no")
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Sequence[str], values: Tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _fmt(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name, self.help, self.labelnames = name, help_text, tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labelvalues: str, amount: float = 1):
+        key = tuple(str(v) for v in labelvalues)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.labelnames, key)} {_fmt(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name, self.help, self.labelnames = name, help_text, tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, ...], List] = {}  # labels -> [bucket counts..., +Inf count, sum]
+
+    def observe(self, value: float, *labelvalues: str):
+        key = tuple(str(v) for v in labelvalues)
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[i] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = {key: list(series) for key, series in self._series.items()}
+        for key, series in sorted(snapshot.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), series[:-1]):
+                cumulative += count
+                labels = _labels(self.labelnames + ("le",), key + (_fmt(bound),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_fmt(series[-1])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named counters/histograms plus stats() collectors, rendered as one Prometheus page."""
+
+    def __init__(self):
+        self._metrics: List = []
+        self._collectors: List[Tuple[str, Callable[[], Optional[Dict]]]] = []
+        self.stage_seconds = self._add(Histogram("chat_stage_seconds", "Latency of one chat pipeline stage.", ("stage",)))
+        self.requests = self._add(Counter("watsonx_requests_total", "Upstream watsonx attempts by endpoint and status.", ("endpoint", "status")))
+        self.errors = self._add(Counter("watsonx_errors_total", "Failed upstream watsonx attempts by status.", ("status",)))
+        self.tokens = self._add(Counter("watsonx_tokens_total", "Tokens reported in the response usage block.", ("kind",)))
+        self.replies = self._add(Counter("chat_replies_total", "Chat replies by where they came from.", ("source",)))
+        self.reply_seconds = self._add(Histogram("chat_reply_seconds", "Time from prompt to reply by source.", ("source",)))
+
+    def _add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, prefix: str, collect: Callable[[], Optional[Dict]]):
+        """Export the numeric top-level values of `collect()` as gauges named <prefix>_<key>."""
+        self._collectors.append((prefix, collect))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for prefix, collect in self._collectors:
+            try:
+                values = collect()
+            except Exception:
+                continue
+            for key, value in sorted((values or {}).items()):
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                name = f"{prefix}_{key}"
+                lines.append(f"# TYPE {name} gauge")
+                lines.append(f"{name} {_fmt(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _loaded(module: str, getter: str) -> Callable[[], Optional[Dict]]:
+    """Collector for a singleton's stats(), only once the process has imported its module."""
+    def collect():
+        mod = sys.modules.get(module)
+        return getattr(mod, getter)().stats() if mod is not None else None
+    return collect
+
+
+# --- Process-wide instance shared by all sessions ---
+_registry: Optional[MetricsRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_metrics() -> MetricsRegistry:
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                registry = MetricsRegistry()
+                registry.register_collector("chat_response_cache", _loaded("utils.response_cache", "get_response_cache"))
+                registry.register_collector("chat_semantic_cache", _loaded("utils.semantic_cache", "get_semantic_cache"))
+                registry.register_collector("chat_intent_router", _loaded("utils.intent_router", "get_intent_router"))
+                registry.register_collector("chat_single_flight", _loaded("utils.single_flight", "get_single_flight"))
+                registry.register_collector("chat_scheduler", _loaded("utils.llm_scheduler", "get_scheduler"))
+                registry.register_collector("watsonx_iam", _loaded("utils.watsonx_client", "get_token_manager"))
+                _registry = registry
+    return _registry
+
+
+# --- Recording helpers (no-ops when METRICS_ENABLED=0) ---
+def observe_stage(stage: str, seconds: float):
+    if METRICS_ENABLED:
+        get_metrics().stage_seconds.observe(seconds, stage)
+
+
+@contextmanager
+def stage_timer(stage: str):
+    """Time the enclosed block as `stage` (recorded even when it raises)."""
+    if not METRICS_ENABLED:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        get_metrics().stage_seconds.observe(time.perf_counter() - t0, stage)
+
+
+def record_upstream(endpoint: str, status, ok: bool):
+    if METRICS_ENABLED:
+        metrics = get_metrics()
+        metrics.requests.inc(endpoint, status)
+        if not ok:
+            metrics.errors.inc(status)
+
+
+def record_usage(usage):
+    """Count prompt/completion tokens from a response `usage` block."""
+    if not METRICS_ENABLED or not isinstance(usage, dict):
+        return
+    for kind in ("prompt_tokens", "completion_tokens"):
+        value = usage.get(kind)
+        if isinstance(value, (int, float)) and value > 0:
+            get_metrics().tokens.inc(kind.split("_")[0], amount=value)
+
+
+def record_reply(source: str, seconds: float):
+    if METRICS_ENABLED:
+        metrics = get_metrics()
+        metrics.replies.inc(source)
+        metrics.reply_seconds.observe(seconds, source)
+
+
+def render_prometheus() -> str:
+    return get_metrics().render()
+
+
+# --- /metrics access (see serve.py) ---
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# With a token set, scrapers send "Authorization: Bearer <token>"; without one only loopback clients are served
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+
+def _is_loopback(host: str) -> bool:
+    try:
+        addr = ipaddress.ip_address(host)
+    except ValueError:
+        return host == "localhost"
+    mapped = getattr(addr, "ipv4_mapped", None)  # "::ffff:127.0.0.1" on dual-stack sockets
+    return (mapped or addr).is_loopback
+
+
+def metrics_allowed(client_host: str, authorization: str = "") -> bool:
+    if METRICS_TOKEN:
+        return hmac.compare_digest(authorization, f"Bearer {METRICS_TOKEN}")
+    return _is_loopback(client_host)
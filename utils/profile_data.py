@@ -0,0 +1,88 @@
+# utils/profile_data.py
+"""
+Profile data shared by the landing page and the chat page.
+
+Importing this module makes no Streamlit calls and has no UI side effects, so the chat
+page can read the profile without importing landing.py (which sets the page config,
+injects CSS and renders the top nav). build_profile() assembles the PROFILE dict used
+for the assistant's system instruction: utils.constants (including the project list),
+merged with profile.json for missing fields, with bio.txt as the summary. Only data
+modules are imported (no Streamlit, no rendering helpers).
+"""
+import json
+from pathlib import Path
+from typing import Dict, Optional
+
+from utils.constants import PROJECTS, info, internships, socials
+
+ROOT = Path(__file__).resolve().parent.parent
+BIO_PATH = ROOT / "bio.txt"
+PROFILE_PATH = ROOT / "profile.json"
+BIO_MAX_CHARS = 4000
+
+DEFAULT_PROFILE = {
+    "name": "Keerthana",
+    "headline": "Data Scientist | LLMOps | Generative AI",
+    "summary": "Data Scientist experienced in GenAI, RAG, Streamlit demos, and real-time pipelines.",
+    "resume_bullets": [],
+    "projects": {},
+}
+
+__all__ = ["info", "socials", "internships", "PROJECTS", "load_bio_txt", "load_profile_json", "build_profile"]
+
+
+def slugify(s: str) -> str:
+    return "".join(c.lower() if c.isalnum() else "_" for c in s)[:50]
+
+
+def load_bio_txt(path: Path = BIO_PATH, max_chars: int = BIO_MAX_CHARS) -> Optional[str]:
+    """Custom biography text from bio.txt, or None when it is missing or empty."""
+    try:
+        text = Path(path).read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
+    return text[:max_chars] or None
+
+
+def load_profile_json(path: Path = PROFILE_PATH) -> Dict:
+    """Optional profile.json overrides ({} when absent or invalid)."""
+    try:
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def build_profile(bio_path: Path = BIO_PATH, profile_path: Path = PROFILE_PATH) -> Dict:
+    """PROFILE dict for the chat assistant (a new dict on every call)."""
+    profile = {
+        "name": info.get("Full_Name") or info.get("Name") or info.get("name") or DEFAULT_PROFILE["name"],
+        "headline": info.get("Intro") or info.get("headline") or info.get("Subject") or "",
+        "summary": info.get("About") or info.get("summary") or "",
+        "resume_bullets": [],
+        "projects": {},
+    }
+    if info.get("Project"):
+        profile["resume_bullets"].append("Public projects / course links")
+    if info.get("Email"):
+        profile["resume_bullets"].append(f"Contact: {info.get('Email')}")
+
+    for p in PROJECTS:
+        title = p.get("title") or p.get("name") or "Untitled Project"
+        profile["projects"][slugify(title)] = {
+            "title": title,
+            "summary": p.get("short_description") or p.get("description") or "",
+            "link": p.get("link"),
+            "image_url": p.get("image_url"),
+            "highlights": [],
+        }
+
+    # profile.json fills fields the modules leave empty
+    for k, v in load_profile_json(profile_path).items():
+        if not profile.get(k):
+            profile[k] = v
+
+    bio_text = load_bio_txt(bio_path)
+    if bio_text:
+        profile["summary"] = bio_text
+    return profile
@@ -0,0 +1,259 @@
+# utils/profile_store.py
+"""
+Process-wide profile store: loads the chat profile once and hands every session the
+same frozen snapshot.
+
+A snapshot holds the PROFILE (read-only mappings and tuples, safe to share across
+session threads), the raw source data utils.retrieval chunks (bio text, projects,
+certificates, skills, info), the content version and the per-file digests it was built
+from. The store is the only place that reloads the utils/ data modules.
+A background watcher follows bio.txt, profile.json and the utils/ data modules
+(inotify through watchdog when it is installed, stat polling otherwise). When a file's
+content changes it reloads the changed data modules, rebuilds the profile and swaps
+the new snapshot in with a single assignment, so reruns never touch the filesystem
+and edits go live without a restart.
+
+PROFILE_WATCHER: "auto" (default), "poll" or "off" (load once, no hot reload; the content
+version stays that of the loaded snapshot).
+"""
+import importlib
+import logging
+import os
+import sys
+import threading
+import time
+from types import MappingProxyType
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+
+from utils.response_cache import (
+    PROFILE_SOURCES,
+    PROFILE_STAT_INTERVAL,
+    ROOT,
+    combine_digests,
+    file_digest,
+    set_version_source,
+)
+
+PROFILE_WATCHER = os.getenv("PROFILE_WATCHER", "auto").strip().lower()
+PROFILE_POLL_INTERVAL = float(os.getenv("PROFILE_POLL_INTERVAL", str(PROFILE_STAT_INTERVAL)))
+PROFILE_DEBOUNCE = 0.2  # editors write a file in several events; settle before reloading
+
+logger = logging.getLogger(__name__)
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # optional: fall back to stat polling
+    FileSystemEventHandler = object
+    Observer = None
+
+
+def freeze(value):
+    """Read-only copy: dicts become MappingProxyType, lists/sets become tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def load_source_data() -> Dict:
+    """Raw profile data from bio.txt and the utils/ data modules (as currently loaded)."""
+    from utils import certificates, constants, skill
+    try:
+        bio = (ROOT / "bio.txt").read_text(encoding="utf-8")
+    except OSError:
+        bio = ""
+    return {
+        "bio": bio,
+        "info": constants.info,
+        "socials": constants.socials,
+        "internships": constants.internships,
+        "projects": constants.PROJECTS,
+        "certificates": certificates.certificates,
+        "skills": skill.skills,
+    }
+
+
+def _module_name(rel: str) -> Optional[str]:
+    return rel[:-3].replace("/", ".") if rel.startswith("utils/") and rel.endswith(".py") else None
+
+
+def _stat_sig(rel: str) -> Tuple[int, int]:
+    try:
+        st = (ROOT / rel).stat()
+    except OSError:
+        return (0, -1)
+    return (st.st_mtime_ns, st.st_size)
+
+
+class ProfileSnapshot(NamedTuple):
+    version: str
+    profile: MappingProxyType
+    data: MappingProxyType  # see load_source_data()
+    digests: MappingProxyType  # relative path -> content digest
+    loaded_at: float
+
+
+class _WakeHandler(FileSystemEventHandler):
+    def __init__(self, store: "ProfileStore"):
+        self.store = store
+
+    def on_any_event(self, event):
+        for path in (getattr(event, "src_path", None), getattr(event, "dest_path", None)):
+            if path and os.path.abspath(path) in self.store._watched_paths:
+                self.store._wake.set()
+                return
+
+
+class ProfileStore:
+    """Immutable profile snapshots, rebuilt in the background when a source file changes."""
+
+    def __init__(self, sources: Iterable[str] = PROFILE_SOURCES, watcher: str = PROFILE_WATCHER):
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._sources: Tuple[str, ...] = tuple(sources)
+        self._watched_paths = frozenset(os.path.abspath(ROOT / rel) for rel in self._sources)
+        self._sigs: Dict[str, Tuple[int, int]] = {}
+        self._versions: Dict[Tuple[str, ...], Tuple[str, str]] = {}
+        self._snapshot: Optional[ProfileSnapshot] = None
+        self._thread: Optional[threading.Thread] = None
+        self._observer = None
+        self.mode = "off"
+        self.reloads = 0
+        self.errors = 0
+        self.refresh()
+        # Cache keys follow the snapshot in every mode; with the watcher off they stay pinned
+        # to what was loaded, even if a file is edited on disk
+        set_version_source(self.version_for)
+        if watcher != "off":
+            self._start(watcher)
+
+    # --- Reads (no I/O) ---
+    def snapshot(self) -> ProfileSnapshot:
+        return self._snapshot
+
+    def profile(self) -> MappingProxyType:
+        return self._snapshot.profile
+
+    def version_for(self, sources: Tuple[str, ...]) -> Optional[str]:
+        """Content version of `sources` from the current snapshot (None if one isn't watched)."""
+        snap = self._snapshot
+        if sources == self._sources:
+            return snap.version
+        memo = self._versions.get(sources)
+        if memo and memo[0] == snap.version:
+            return memo[1]
+        if any(rel not in snap.digests for rel in sources):
+            return None
+        version = combine_digests((rel, snap.digests[rel]) for rel in sources)
+        self._versions[sources] = (snap.version, version)
+        return version
+
+    # --- Reload ---
+    def refresh(self) -> bool:
+        """Re-stat the sources; rebuild and swap the snapshot if any content changed."""
+        with self._lock:
+            sigs = {rel: _stat_sig(rel) for rel in self._sources}
+            if self._snapshot is not None and sigs == self._sigs:
+                return False
+            self._sigs = sigs
+            digests = {rel: file_digest(ROOT / rel) for rel in self._sources}
+            version = combine_digests((rel, digests[rel]) for rel in self._sources)
+            old = self._snapshot
+            if old is not None and version == old.version:
+                return False  # touched, not edited
+            try:
+                if old is not None:
+                    self._reload_modules([rel for rel in self._sources if digests[rel] != old.digests.get(rel)])
+                from utils import profile_data
+                profile = freeze(profile_data.build_profile())
+                data = freeze(load_source_data())
+            except Exception:
+                if old is None:
+                    raise
+                self.errors += 1
+                logger.exception("profile reload failed; keeping version %s", old.version)
+                return False
+            self._snapshot = ProfileSnapshot(version, profile, data, MappingProxyType(digests), time.time())
+            if old is not None:
+                self.reloads += 1
+            return True
+
+    @staticmethod
+    def _reload_modules(changed: Iterable[str]):
+        names = [n for n in map(_module_name, changed) if n and n in sys.modules]
+        if names and "utils.profile_data" not in names and "utils.profile_data" in sys.modules:
+            names.append("utils.profile_data")  # re-bind its imports of the reloaded modules
+        for name in names:
+            importlib.reload(sys.modules[name])
+
+    # --- Watcher ---
+    def _start(self, watcher: str):
+        if watcher != "poll" and Observer is not None:
+            try:
+                observer = Observer()
+                handler = _WakeHandler(self)
+                for directory in sorted({os.path.dirname(p) for p in self._watched_paths}):
+                    if os.path.isdir(directory):
+                        observer.schedule(handler, directory, recursive=False)
+                observer.daemon = True
+                observer.start()
+                self._observer = observer
+                self.mode = "inotify" if "inotify" in type(observer).__module__ else "watchdog"
+            except Exception:
+                logger.warning("file watcher unavailable; polling profile sources", exc_info=True)
+                self._observer = None
+        if self._observer is None:
+            self.mode = "poll"
+        self._thread = threading.Thread(target=self._run, name="profile-store-watch", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.is_set():
+            if self._observer is not None:
+                self._wake.wait()
+            else:
+                self._wake.wait(PROFILE_POLL_INTERVAL)
+            if self._stop.is_set():
+                break
+            if self._wake.is_set():
+                time.sleep(PROFILE_DEBOUNCE)
+                self._wake.clear()
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("profile refresh failed")
+
+    def stop(self):
+        set_version_source(None)
+        self._stop.set()
+        self._wake.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer = None
+
+    def stats(self) -> Dict:
+        snap = self._snapshot
+        return {
+            "version": snap.version,
+            "mode": self.mode,
+            "reloads": self.reloads,
+            "errors": self.errors,
+            "loaded_at": snap.loaded_at,
+        }
+
+
+# --- Process-wide instance shared by all sessions ---
+_store: Optional[ProfileStore] = None
+_store_lock = threading.Lock()
+
+
+def get_profile_store() -> ProfileStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ProfileStore(PROFILE_SOURCES, PROFILE_WATCHER)
+    return _store
@@ -1,136 +1,42 @@
 # utils/project.py
 
 from html import escape
-from pathlib import Path
 from typing import List, Dict, Optional
-import base64
-import os
 
 import streamlit as st
 import streamlit.components.v1 as components
 
+from utils.constants import PROJECTS
+from utils.fragment_cache import cached_fragment
+from utils.image_derivatives import ensure_derivatives
+from utils.static_assets import image_src
+
+# Modules whose contents the project HTML fragments depend on (PROJECTS lives in utils/constants.py)
+PROJECT_SOURCES = ("utils/project.py", "utils/constants.py")
+
 # Helper: convert local file 
 
-def file_to_data_uri(rel_path: str) -> str:
+def file_to_data_uri(rel_path: str, variant: Optional[str] = None) -> str:
     """
-    Convert a local file path (relative to current working dir) to a base64 data URI.
+    Image source for a local file path (relative to current working dir).
+    Returns a cacheable static URL when static serving is on, otherwise a base64 data URI
+    (see utils.static_assets). With `variant` (see utils.image_derivatives.VARIANTS) the
+    resized derivative is used instead of the original.
     If file not found or error, returns the original rel_path (so HTTP/absolute URLs still pass through).
     """
     try:
         if not rel_path:
             return ""
-        # if already a data URI or remote URL, return unchanged
-        if rel_path.startswith("data:") or rel_path.startswith("http://") or rel_path.startswith("https://"):
-            return rel_path
-
-        p = Path(os.getcwd()) / rel_path
-        if not p.exists():
-            # try as absolute path if user passed absolute
-            p2 = Path(rel_path)
-            if p2.exists():
-                p = p2
-            else:
-                return rel_path
-
-        ext = p.suffix.lower().lstrip(".")
-        mime = {"png": "image/png", "jpg": "image/jpeg", "jpeg": "image/jpeg", "webp": "image/webp", "gif": "image/gif"}.get(ext, None)
-        if not mime:
-            # unknown extension: let Streamlit handle it by returning path
-            return rel_path
-
-        raw = p.read_bytes()
-        b64 = base64.b64encode(raw).decode("ascii")
-        return f"data:{mime};base64,{b64}"
+        return image_src(rel_path, variant)
     except Exception:
         return rel_path
 
-PROJECTS: List[Dict] = [
-    {
-        "title": "AI Portfolio (This site)",
-        "short_description": "My GenAI portfolio built with Streamlit — RAG demos, projects and docs.",
-        "full_description": "This portfolio showcases my RAG demos, Streamlit apps, and GenAI experiments. Built with Streamlit, custom components and local embeddings.",
-        "tech": ["Streamlit", "Python", "RAG", "LLMOps"],
-        "link": "https://github.com/Keerthana-DS-ghub/Genai-portfolio",
-        "image_url": "images/Portfolio.jpg",
-    },
-    {
-        "title": "AI-Powered RAG Assistant",
-        "short_description": "Context-aware RAG chatbot using LangChain, WatsonX embeddings & ChromaDB.",
-        "full_description": "Developed a fully functional RAG chatbot capable of answering questions from uploaded documents. Integrated IBM WatsonX Embeddings with LangChain and ChromaDB.",
-        "tech": ["LangChain", "IBM WatsonX", "ChromaDB", "Gradio", "Python"],
-        "link": "https://github.com/Keerthana-DS-ghub/AI-Powered-RAG-Assistant-Using-LangChain-and-Gradio",
-        "image_url": "images/Rag.webp",
-    },
-    {
-        "title": "NLP Text Preprocessing Pipeline",
-        "short_description": "Tokenization, normalization, stopword removal, stemming & lemmatization.",
-        "full_description": "Robust text preprocessing pipeline using NLTK / spaCy and Pandas to clean text for downstream tasks.",
-        "tech": ["Python", "NLTK", "spaCy", "Pandas"],
-        "link": "https://github.com/Keerthana-DS-ghub/Text_Preprocessing/blob/main/README.md",
-        "image_url": "images/NLP.png",
-    },
-    {
-        "title": "Time Series Forecasting with ARIMA & SARIMAX",
-        "short_description": "Forecasting with ARIMA/SARIMAX; stationarity & seasonality analysis.",
-        "full_description": "Built forecasting models using ARIMA and SARIMAX for real-world datasets, with ADF tests and decomposition.",
-        "tech": ["Python", "Statsmodels", "Pandas", "Matplotlib"],
-        "link": "https://github.com/Keerthana-DS-ghub/Time-Serie-Arima-Sarimax",
-        "image_url": "images/TimeSeries.jpg",
-    },
-    {
-    "title": "Credit Card Fraud Detection",
-    "short_description": "Machine Learning–based fraud detection on highly imbalanced credit card transaction data.",
-    "full_description": (
-        "Built a fraud detection system using multiple ML models on a highly imbalanced dataset."
-        "Performed EDA, feature scaling, and correlation analysis. "
-        "Handled class imbalance using undersampling, oversampling, and SMOTE. "
-        "Trained and evaluated Logistic Regression, Decision Tree, Random Forest, SVM, and XGBoost models."
-        "Focused on Recall, Precision, F1-score, and ROC-AUC to minimize false negatives in fraud detection."
-    ),
-    "tech": ["Python","Pandas","NumPy","Scikit-learn","Imbalanced-learn","Matplot","XGBoost"],
-    "link": "https://github.com/Keerthana-DS-ghub/Credit_Card_Fraud_Detection",  
-    "image_url": "images/creditcard1.png"
-    },
-
-    {
-        "title": "Real-Time AMFI Mutual Fund Analysis",
-        "short_description": "Automated AMFI NAV ingestion into MySQL and Power BI dashboards.",
-        "full_description": "Automated extraction of AMFI mutual fund data using Python and wrote ingestion scripts to MySQL; visualized in Power BI.",
-        "tech": ["Python", "MySQL", "Power BI"],
-        "link": "https://github.com/Keerthana-DS-ghub/-Real-Time-AMFI-Mutual-Fund-Data-Analysis",
-        "image_url": "images/Amfi.png",
-    },
-    {
-        "title": "Pandas: Hotel Booking Insights",
-        "short_description": "EDA, outlier removal & visualizations for hotel booking data.",
-        "full_description": "Merged datasets, removed outliers (3-sigma) and visualized booking trends to extract user behaviour patterns.",
-        "tech": ["Pandas", "Matplotlib", "Python"],
-        "link": "https://github.com/Keerthana-DS-ghub/Analysing_Hotel_booking",
-        "image_url": "images/HotelBooking.png",
-    },
-    {
-        "title": "SQL Project: Sales Forecast & Revenue Analysis",
-        "short_description": "Multi-table MySQL analysis: forecasting, margin breakdown, deductions.",
-        "full_description": "Multi-table analytics using MySQL covering forecasting, pricing, invoice deductions and manufacturing cost analysis.",
-        "tech": ["MySQL", "SQL", "Power BI"],
-        "link": "https://github.com/Keerthana-DS-ghub/SQL_Project",
-        "image_url": "images/SQL BANNER1.png",
-    },
-    {
-        "title": "Employee Performance Dashboard (Power BI)",
-        "short_description": "HR analytics dashboard: attrition, performance, salary trends (DAX).",
-        "full_description": "Interactive HR analytics dashboard using Power BI and advanced DAX measures.",
-        "tech": ["Power BI", "DAX", "Excel"],
-        "link": "https://github.com/Keerthana-DS-ghub/Employee-Performance-Analysis",
-        "image_url": "images/PowerBI.jpg",
-    },
-]
 
-def render_glass_projects(projects: Optional[List[Dict]] = None, cols: int = 3, card_width: int = 340):
-    projects = projects if projects is not None else PROJECTS
-    if not projects:
-        st.info("No projects to show.")
-        return
+@cached_fragment("glass_projects", sources=PROJECT_SOURCES)
+def build_glass_projects_html(projects: List[Dict], cols: int = 3) -> str:
+    """HTML for the glass project grid (cached per project data and layout)."""
+    # build any missing thumbnails in parallel before the per-card loop
+    ensure_derivatives([p.get("image_url") or p.get("image") or "" for p in projects], "card")
 
     cards_html = []
     for idx, p in enumerate(projects):
@@ -138,7 +44,7 @@ def render_glass_projects(projects: Optional[List[Dict]] = None, cols: int = 3,
         short = escape(p.get("short_description") or p.get("description") or "")
         raw_img = p.get("image_url") or p.get("image") or ""
         # convert local files to data uri for iframe-safe rendering
-        img_src = file_to_data_uri(raw_img) if raw_img else ""
+        img_src = file_to_data_uri(raw_img, "card") if raw_img else ""
         img = escape(img_src)
         tech = p.get("tech") or p.get("tags") or []
         tech_html = " ".join(f"<span class='tag'>{escape(t)}</span>" for t in tech[:6])
@@ -190,6 +96,16 @@ def render_glass_projects(projects: Optional[List[Dict]] = None, cols: int = 3,
         {''.join(cards_html)}
     </div>
     """
+    return html
+
+
+def render_glass_projects(projects: Optional[List[Dict]] = None, cols: int = 3, card_width: int = 340):
+    projects = projects if projects is not None else PROJECTS
+    if not projects:
+        st.info("No projects to show.")
+        return
+
+    html = build_glass_projects_html(projects, cols)
 
     try:
         # height heuristic: base + rows * extra
@@ -217,27 +133,17 @@ def render_glass_projects(projects: Optional[List[Dict]] = None, cols: int = 3,
                     st.markdown(f"[Repository / Demo]({p.get('link')})")
 
 
-def render_glass_carousel(projects: Optional[List[Dict]] = None, height: int = 780, card_width: int = 360, visible: int = 3):
-    """
-    Render a horizontal glass-morphism carousel of project cards.
-
-    Args:
-        projects: list of project dicts (defaults to PROJECTS)
-        height: iframe height to reserve for the carousel (px)
-        card_width: preferred card width (px)
-        visible: hint for how many cards should be visible (not enforced)
-    """
-    projects = projects if projects is not None else PROJECTS
-    if not projects:
-        st.info("No projects to show.")
-        return
+@cached_fragment("carousel", sources=PROJECT_SOURCES)
+def build_glass_carousel_html(projects: List[Dict], height: int = 780, card_width: int = 360) -> str:
+    """HTML for the project carousel (cached per project data and layout)."""
+    ensure_derivatives([p.get("image_url") or p.get("image") or "" for p in projects], "carousel")
 
     slides = []
     for idx, p in enumerate(projects):
         title = escape(p.get("title", "Untitled"))
         short = escape(p.get("short_description") or p.get("description") or "")
         raw_img = p.get("image_url") or p.get("image") or ""
-        img_src = file_to_data_uri(raw_img) if raw_img else ""
+        img_src = file_to_data_uri(raw_img, "carousel") if raw_img else ""
         img = escape(img_src)
         tech = p.get("tech") or p.get("tags") or []
         tech_html = " ".join(f"<span class='tag'>{escape(t)}</span>" for t in tech[:6])
@@ -378,6 +284,26 @@ def render_glass_carousel(projects: Optional[List[Dict]] = None, height: int = 7
     html = html.replace("__SLIDES__", "".join(slides))
     html = html.replace("__CARD_WIDTH_MOBILE__", str(int(card_width * 0.9)))
     html = html.replace("__CARD_WIDTH_MOBILE2__", str(int(card_width * 0.78)))
+    return html
+
+
+def render_glass_carousel(projects: Optional[List[Dict]] = None, height: int = 780, card_width: int = 360, visible: int = 3):
+    """
+    Render a horizontal glass-morphism carousel of project cards.
+
+    Args:
+        projects: list of project dicts (defaults to PROJECTS)
+        height: iframe height to reserve for the carousel (px)
+        card_width: preferred card width (px)
+        visible: hint for how many cards should be visible (not enforced)
+    """
+    projects = projects if projects is not None else PROJECTS
+    if not projects:
+        st.info("No projects to show.")
+        return
+
+    html = build_glass_carousel_html(projects, height, card_width)
+    min_h = max(320, int(height - 80))
 
     try:
         # allocate iframe height large enough so images/cards aren't clipped
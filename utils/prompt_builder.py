@@ -0,0 +1,228 @@
+# utils/prompt_builder.py
+"""
+System-prompt assembly for the chat page.
+
+The system instruction is compiled once per profile content version (a hash of the
+profile source files) and shared by every session, so a message costs an O(1) lookup.
+
+With PROFILE_RETRIEVAL on (default) the compiled instruction holds only the rules and a
+small always-on core (name, headline, latest project, contact block); the top-k profile
+chunks relevant to each question are appended per message by system_instruction_for().
+"""
+import os
+import threading
+from typing import Callable, Dict, Mapping, NamedTuple, Optional
+
+from utils.certificates import certificates_as_text
+from utils.constants import internships
+from utils.response_cache import profile_version
+from utils.retrieval import TOP_K, retrieve_lines
+from utils.token_budget import INPUT_TOKEN_BUDGET, USER_TURN_MAX_TOKENS, fit_sections, truncate_to_tokens
+
+RETRIEVAL_ENABLED = os.getenv("PROFILE_RETRIEVAL", "1").lower() not in ("0", "false", "no")
+
+LATEST_PROJECT = (
+    "LATEST_PROJECT (MOST RECENT, PRIORITIZE THIS): "
+    "Watsonx-powered GenAI Portfolio App with RAG-based AI assistant, "
+    "Streamlit UI, and deployment-ready architecture."
+)
+
+CONTACT_BLOCK = (
+    "CONTACT_INFORMATION (AUTHORITATIVE – USE THIS EXACTLY IF ASKED):\n"
+    "Email: skeerthi.datascience@gmail.com\n"
+    "LinkedIn: https://www.linkedin.com/in/keerthana-datascience/\n"
+)
+
+ASSISTANT_RULES = (
+    "You are Keerthana's personal AI portfolio assistant.\n\n"
+
+    "IMPORTANT – Greeting behavior:\n"
+    "- If the user greets you (e.g., hi, hello, hey, good morning),\n"
+    "  respond with a friendly greeting and briefly explain what you can help with.\n"
+    "- Do NOT provide a professional summary or bullet points for greetings.\n"
+    "- Invite the user to ask a question.\n\n"
+
+    "Your role:\n"
+    "- Answer recruiter and interviewer questions about Keerthana.\n"
+    "- Use ONLY the information provided in {context_sections}.\n"
+    "- Do NOT invent skills, projects, gaps, salary numbers, or dates.\n"
+    "- If a question is outside her profile, respond:\n"
+    "  'I can answer only about Keerthana’s skills, projects, and experience.'\n\n"
+
+    "Recruiter questions handling:\n"
+    "- The user may ask MULTIPLE questions in one message.\n"
+    "- Answer each question clearly with labeled sections.\n"
+    "- Be confident and precise; avoid uncertain phrasing such as 'not explicitly stated'.\n\n"
+
+    "IMPORTANT – Strengths & weaknesses questions:\n"
+    "- Clearly state strengths.\n"
+    "- For weaknesses, NEVER guess gaps.\n"
+    "- Frame weaknesses as areas of ongoing learning or growth.\n"
+    "- Do NOT imply missing skills or lack of ability.\n\n"
+
+    "IMPORTANT – Strengths & weaknesses questions:\n"
+    "- Clearly state strengths with examples.\n"
+    "- For weaknesses:\n"
+         "* Do NOT mention specific missing skills or gaps.\n"
+         "* Frame as continuous learning and growth mindset only.\n"
+         "* Keep it general and positive.\n"
+
+    "IMPORTANT – Availability questions:\n"
+    "- If the user asks about start date or availability (e.g., 'When can she start work?'),\n"
+    "  respond with availability FIRST.\n"
+    "- Keep the answer short (1–2 lines).\n"
+    "- Do NOT include skills, projects, or background in this section.\n\n"
+
+    "For salary-related questions:\n"
+    "- Never mention numbers.\n"
+    "- Respond diplomatically.\n"
+    "- Emphasize learning, growth, and market-aligned compensation.\n\n"
+
+    "For contact information:\n"
+    "- If the user asks for contact details, you MUST respond using CONTACT_INFORMATION verbatim.\n"
+    "- Present each contact item on a separate line.\n\n"
+
+    "Answering style for NON-GREETING questions:\n"
+    "- Start with a 1-line professional summary.\n"
+    "- Then answer each question in clearly labeled sections.\n"
+    "- Use concise bullet points where appropriate.\n"
+    "- Focus on impact, technologies, and outcomes.\n"
+    "- Keep responses recruiter-friendly and easy to scan.\n\n"
+)
+
+
+def internship_line(it: Dict) -> str:
+    period = f" ({it['period']})" if it.get("period") else ""
+    return f"- {it.get('company', '')}{period}: {it.get('summary', '')}"
+
+
+def build_profile_context(profile: Dict, max_chars: int = 2000) -> str:
+    """Build a short PROFILE context to include in the system message."""
+    parts = []
+
+    # --- Basic profile ---
+    parts.append(f"Name: {profile.get('name','Keerthana')}")
+    if profile.get("headline"):
+        parts.append(f"Headline: {profile.get('headline')}")
+    if profile.get("summary"):
+        parts.append("Summary:")
+        parts.append(profile.get("summary"))
+
+    # --- Resume bullets ---
+    if profile.get("resume_bullets"):
+        parts.append("Key Highlights:")
+        for b in profile.get("resume_bullets", [])[:8]:
+            parts.append(f"- {b}")
+
+    # --- Projects ---
+    if profile.get("projects"):
+        parts.append("Projects:")
+        for _, p in list(profile.get("projects", {}).items())[:6]:
+            title = p.get("title", "Untitled")
+            summary = p.get("summary", "")
+            parts.append(f"* {title}: {summary}")
+
+    # --- Certificates (NEW) ---
+    cert_text = certificates_as_text()
+    if cert_text:
+        parts.append("Certifications:")
+        parts.append(cert_text)
+
+    # --- Internship Experience (NEW) ---
+    parts.append("Internship Experience:")
+    for it in internships:
+        parts.append(internship_line(it))
+
+    # --- Most Recent Work ---
+    parts.append(LATEST_PROJECT)
+
+    # --- Contact Information (AUTHORITATIVE SOURCE) ---
+    parts.append(CONTACT_BLOCK.rstrip())
+
+    core_text = "\n".join(parts)
+
+    contact_block = "\n" + CONTACT_BLOCK
+    # Truncate ONLY the core context, never the contact block
+    core_text = core_text[: max_chars - len(contact_block) - 50]
+
+    return core_text + contact_block
+
+
+def build_core_context(profile: Dict) -> str:
+    """The part of PROFILE_CONTEXT that is sent with every question, whatever was retrieved."""
+    parts = [f"Name: {profile.get('name','Keerthana')}"]
+    if profile.get("headline"):
+        parts.append(f"Headline: {profile.get('headline')}")
+    parts.append(LATEST_PROJECT)
+    return "\n".join(parts) + "\n" + CONTACT_BLOCK
+
+
+def assistant_rules(context_sections: str) -> str:
+    """ASSISTANT_RULES naming the context sections the instruction actually contains."""
+    return ASSISTANT_RULES.replace("{context_sections}", context_sections)
+
+
+def build_system_instruction(profile: Dict) -> str:
+    """Build system instruction including BIO (if available) and PROFILE context."""
+    if RETRIEVAL_ENABLED:
+        # BIO and the rest of the profile arrive as retrieved excerpts per question
+        rules = assistant_rules("PROFILE_CONTEXT and PROFILE_EXCERPTS")
+        return rules + f"PROFILE_CONTEXT:\n{build_core_context(profile)}"
+
+    profile_ctx = build_profile_context(profile)
+    bio_snippet = profile.get("summary", "") or ""
+
+    system_instruction = (
+        assistant_rules("BIO and PROFILE_CONTEXT")
+        + f"BIO:\n{bio_snippet}\n\n"
+        + f"PROFILE_CONTEXT:\n{profile_ctx}\n"
+    )
+    return system_instruction
+
+
+def system_instruction_for(prompt: str, instruction: str, k: int = TOP_K,
+                           budget: int = INPUT_TOKEN_BUDGET, reserved: int = 0) -> str:
+    """
+    The compiled instruction plus the profile excerpts most relevant to `prompt`, as many
+    as fit in the input token budget next to the instruction, the user turn and
+    `reserved` tokens of conversation history.
+    """
+    if not RETRIEVAL_ENABLED:
+        return instruction
+    excerpts = fit_sections([instruction, prompt], retrieve_lines(prompt, k), budget - reserved)
+    if not excerpts:
+        return instruction
+    return f"{instruction}PROFILE_EXCERPTS (relevant bio and profile data):\n" + "\n".join(excerpts) + "\n"
+
+
+def clip_user_turn(prompt: str) -> str:
+    """Bound a pasted wall of text so it cannot crowd the profile out of the budget."""
+    return truncate_to_tokens(prompt, USER_TURN_MAX_TOKENS)
+
+
+class CompiledPrompt(NamedTuple):
+    version: str
+    profile: Mapping
+    instruction: str
+
+
+_compiled: Optional[CompiledPrompt] = None
+_compile_lock = threading.Lock()
+
+
+def get_compiled_prompt(load_profile_fn: Callable[[], Mapping]) -> CompiledPrompt:
+    """
+    Return the compiled prompt for the current content version.
+    `load_profile_fn` is only called (and the instruction only rebuilt) when one of the
+    profile source files changed since the last compile.
+    """
+    global _compiled
+    version = profile_version()
+    compiled = _compiled
+    if compiled is not None and compiled.version == version:
+        return compiled
+    with _compile_lock:
+        if _compiled is None or _compiled.version != version:
+            profile = load_profile_fn()
+            _compiled = CompiledPrompt(version, profile, build_system_instruction(profile))
+        return _compiled
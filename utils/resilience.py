@@ -0,0 +1,202 @@
+# utils/resilience.py
+"""
+Retry, backoff and circuit breaking for watsonx calls.
+
+Attempts return the client's result dicts ({"ok": ..., "status": ..., "text": ...}).
+Transient failures (429, 5xx, connection errors) are retried with full-jitter
+exponential backoff, honouring Retry-After, until the per-message deadline is spent.
+A circuit breaker fails fast while the deployment keeps failing and lets a single
+half-open probe through after a cool-down to detect recovery. IAM token failures
+({"iam_error": True}) say nothing about the deployment: they are returned at once,
+without generation retries, and are not counted by the breaker.
+"""
+import email.utils
+import os
+import random
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+MAX_ATTEMPTS = int(os.getenv("WATSONX_MAX_ATTEMPTS", "4"))
+BACKOFF_BASE = float(os.getenv("WATSONX_BACKOFF_BASE", "0.5"))
+BACKOFF_CAP = float(os.getenv("WATSONX_BACKOFF_CAP", "8"))
+# Total time budget for one user message, across all attempts and waits
+REQUEST_DEADLINE = float(os.getenv("WATSONX_DEADLINE", "90"))
+BREAKER_FAILURES = int(os.getenv("WATSONX_BREAKER_FAILURES", "5"))
+BREAKER_COOLDOWN = float(os.getenv("WATSONX_BREAKER_COOLDOWN", "30"))
+
+RETRYABLE_STATUS = {0, 408, 429, 500, 502, 503, 504}
+# 429 means the deployment is alive but throttling; it does not trip the breaker
+BREAKER_STATUS = RETRYABLE_STATUS - {429}
+
+
+def parse_retry_after(value) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when is None:
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+def backoff_delay(attempt: int, base: float = BACKOFF_BASE, cap: float = BACKOFF_CAP) -> float:
+    """Full-jitter exponential backoff for the given 1-based retry number."""
+    return random.uniform(0, min(cap, base * (2 ** (attempt - 1))))
+
+
+def is_retryable(result: Dict) -> bool:
+    if result.get("ok") or result.get("circuit_open") or result.get("iam_error"):
+        return False
+    return result.get("status", 0) in RETRYABLE_STATUS
+
+
+class CircuitBreaker:
+    """Closed -> open after N consecutive failures -> half-open probe after a cool-down."""
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int = BREAKER_FAILURES, cooldown: float = BREAKER_COOLDOWN):
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.cooldown = float(cooldown)
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._stats = {"opened": 0, "short_circuited": 0, "probes": 0}
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    def retry_in(self) -> float:
+        return max(0.0, self._opened_at + self.cooldown - time.monotonic())
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.cooldown:
+                self._state = self.HALF_OPEN
+            if self._state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                self._stats["probes"] += 1
+                return True
+            self._stats["short_circuited"] += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def release(self):
+        """The allowed attempt never reached the deployment: free the probe, keep the state."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self._stats["opened"] += 1
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            out = dict(self._stats)
+            out["state"] = self._state
+            out["consecutive_failures"] = self._failures
+        return out
+
+
+class RetryStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.attempts = 0
+        self.retries = 0
+        self.deadline_exceeded = 0
+
+    def add(self, **counts):
+        with self._lock:
+            for k, v in counts.items():
+                setattr(self, k, getattr(self, k) + v)
+
+    def as_dict(self) -> Dict[str, int]:
+        with self._lock:
+            return {"calls": self.calls, "attempts": self.attempts, "retries": self.retries,
+                    "deadline_exceeded": self.deadline_exceeded}
+
+
+_breaker = CircuitBreaker()
+_retry_stats = RetryStats()
+
+
+def get_breaker() -> CircuitBreaker:
+    return _breaker
+
+
+def resilience_stats() -> Dict[str, object]:
+    out = _retry_stats.as_dict()
+    out["breaker"] = _breaker.stats()
+    return out
+
+
+def call_with_retries(attempt_fn: Callable[[float], Dict], timeout: float = 60,
+                      deadline: Optional[float] = None, max_attempts: int = MAX_ATTEMPTS,
+                      breaker: Optional[CircuitBreaker] = None) -> Dict:
+    """
+    Run `attempt_fn(attempt_timeout)` until it succeeds, fails permanently, or the
+    deadline budget (seconds, default WATSONX_DEADLINE) is spent.
+    """
+    breaker = breaker or _breaker
+    budget = REQUEST_DEADLINE if deadline is None else float(deadline)
+    ends_at = time.monotonic() + budget
+    _retry_stats.add(calls=1)
+    result: Dict = {"ok": False, "status": 0, "text": "No attempt made."}
+    for attempt in range(1, max(1, max_attempts) + 1):
+        remaining = ends_at - time.monotonic()
+        if remaining <= 0.5:
+            _retry_stats.add(deadline_exceeded=1)
+            break
+        if not breaker.allow():
+            return {
+                "ok": False,
+                "status": 503,
+                "circuit_open": True,
+                "text": f"The watsonx deployment is currently unavailable; retrying in {breaker.retry_in():.0f}s.",
+            }
+        _retry_stats.add(attempts=1)
+        try:
+            result = attempt_fn(min(timeout, remaining))
+        except Exception as e:
+            result = {"ok": False, "status": 0, "text": f"Request failed: {e}"}
+        status = result.get("status", 0)
+        if result.get("iam_error"):
+            breaker.release()
+        elif result.get("ok") or status not in BREAKER_STATUS:
+            breaker.record_success()
+        else:
+            breaker.record_failure()
+        if not is_retryable(result) or attempt >= max_attempts:
+            return result
+        delay = max(backoff_delay(attempt), result.get("retry_after") or 0.0)
+        if time.monotonic() + delay >= ends_at:
+            _retry_stats.add(deadline_exceeded=1)
+            return result
+        _retry_stats.add(retries=1)
+        time.sleep(delay)
+    return result
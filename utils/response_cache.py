@@ -0,0 +1,214 @@
+# utils/response_cache.py
+"""
+Exact-match cache for chat replies.
+
+Key = normalized user prompt + hash of the assembled system instruction + profile version.
+The profile version is a hash of the profile source files, so editing bio.txt or the
+utils data modules changes every key and stale answers are never served.
+Entries are evicted by LRU and TTL; set CHAT_CACHE_PATH to persist them in SQLite.
+"""
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+
+PROFILE_SOURCES = (
+    "bio.txt",
+    "profile.json",
+    "utils/constants.py",
+    "utils/certificates.py",
+    "utils/skill.py",
+    "utils/profile_data.py",
+)
+
+CACHE_TTL = float(os.getenv("CHAT_CACHE_TTL", "86400"))
+CACHE_MAX_ENTRIES = int(os.getenv("CHAT_CACHE_MAX_ENTRIES", "512"))
+CACHE_PATH = os.getenv("CHAT_CACHE_PATH", "")
+
+_WS = re.compile(r"\s+")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Fold case, whitespace and punctuation so trivially different prompts share a key."""
+    text = unicodedata.normalize("NFKC", prompt or "").casefold()
+    text = text.replace("'", "").replace("’", "")
+    text = "".join(" " if unicodedata.category(ch).startswith("P") else ch for ch in text)
+    return _WS.sub(" ", text).strip()
+
+
+# --- Profile version (content hash, re-hashed only when a file's stat changes) ---
+# Source files are re-stat'ed at most this often (seconds)
+PROFILE_STAT_INTERVAL = float(os.getenv("PROFILE_STAT_INTERVAL", "1.0"))
+
+_version_lock = threading.Lock()
+_file_hashes: Dict[str, Tuple[Tuple[int, int], str]] = {}
+_version_memo: Dict[Tuple[str, ...], Tuple[float, str]] = {}
+
+
+def file_digest(path: Path) -> str:
+    """sha256 of a file's contents, recomputed only when its mtime or size changes."""
+    try:
+        st = path.stat()
+    except OSError:
+        return "missing"
+    sig = (st.st_mtime_ns, st.st_size)
+    cached = _file_hashes.get(str(path))
+    if cached and cached[0] == sig:
+        return cached[1]
+    digest = hashlib.sha256(path.read_bytes()).hexdigest()
+    _file_hashes[str(path)] = (sig, digest)
+    return digest
+
+
+def combine_digests(pairs: Iterable[Tuple[str, str]]) -> str:
+    """Short version hash over (relative path, content digest) pairs."""
+    h = hashlib.sha256()
+    for rel, digest in pairs:
+        h.update(rel.encode("utf-8"))
+        h.update(digest.encode("ascii"))
+    return h.hexdigest()[:16]
+
+
+# Set by the profile store while its watcher runs: answers from memory, no stat calls
+_version_source: Optional[Callable[[Tuple[str, ...]], Optional[str]]] = None
+
+
+def set_version_source(source: Optional[Callable[[Tuple[str, ...]], Optional[str]]]):
+    global _version_source
+    _version_source = source
+
+
+def profile_version(sources=PROFILE_SOURCES) -> str:
+    """Short hash over the contents of the profile source files."""
+    sources = tuple(sources)
+    source = _version_source
+    if source is not None:
+        version = source(sources)
+        if version is not None:
+            return version
+    now = time.monotonic()
+    memo = _version_memo.get(sources)
+    if memo and now - memo[0] < PROFILE_STAT_INTERVAL:
+        return memo[1]
+    with _version_lock:
+        version = combine_digests((rel, file_digest(ROOT / rel)) for rel in sources)
+    _version_memo[sources] = (now, version)
+    return version
+
+
+_last_instruction: Tuple[Optional[str], str] = (None, "")
+
+
+def content_version(system_instruction: str) -> str:
+    """Version of everything a reply depends on besides the prompt."""
+    global _last_instruction
+    last, sys_hash = _last_instruction
+    if system_instruction is not last:
+        # The compiled instruction is a shared object, so this hash runs once per version
+        sys_hash = hashlib.sha256((system_instruction or "").encode("utf-8")).hexdigest()[:16]
+        _last_instruction = (system_instruction, sys_hash)
+    return f"{profile_version()}-{sys_hash}"
+
+
+def make_cache_key(prompt: str, system_instruction: str, scope: str = "") -> str:
+    """Key for `prompt` under the current content version; `scope` (a session id) makes it private."""
+    raw = f"{content_version(system_instruction)}|{normalize_prompt(prompt)}"
+    if scope:
+        raw = f"{scope}|{raw}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Thread-safe LRU + TTL cache with an optional SQLite write-through backend."""
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, ttl: float = CACHE_TTL, path: str = ""):
+        self.max_entries = max(1, int(max_entries))
+        self.ttl = float(ttl)
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+        self.hits = 0
+        self.misses = 0
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS replies (key TEXT PRIMARY KEY, created REAL, value TEXT)")
+            self._db.execute("DELETE FROM replies WHERE created < ?", (time.time() - self.ttl,))
+            self._db.commit()
+
+    def _expired(self, created: float) -> bool:
+        return time.time() - created > self.ttl
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None and self._db is not None:
+                row = self._db.execute("SELECT created, value FROM replies WHERE key = ?", (key,)).fetchone()
+                if row:
+                    entry = (row[0], row[1])
+                    self._store(key, entry)
+            if entry is None or self._expired(entry[0]):
+                if entry is not None:
+                    self._drop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: str, value: str):
+        if not value:
+            return
+        entry = (time.time(), value)
+        with self._lock:
+            self._store(key, entry)
+            if self._db is not None:
+                self._db.execute("INSERT OR REPLACE INTO replies (key, created, value) VALUES (?, ?, ?)", (key, entry[0], value))
+                self._db.commit()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM replies")
+                self._db.commit()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+    def _store(self, key: str, entry: Tuple[float, str]):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            old_key, _ = self._entries.popitem(last=False)
+            if self._db is not None:
+                self._db.execute("DELETE FROM replies WHERE key = ?", (old_key,))
+                self._db.commit()
+
+    def _drop(self, key: str):
+        self._entries.pop(key, None)
+        if self._db is not None:
+            self._db.execute("DELETE FROM replies WHERE key = ?", (key,))
+            self._db.commit()
+
+
+# --- Process-wide instance shared by all sessions ---
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache(CACHE_MAX_ENTRIES, CACHE_TTL, CACHE_PATH)
+    return _cache
@@ -0,0 +1,115 @@
+# utils/response_parser.py
+"""
+Decoding and reply extraction for watsonx responses.
+
+extract_text() reads the known chat and generation schemas directly
+(choices[0].message.content, choices[0].delta.content, results[0].generated_text) and
+only walks the JSON generically as a fallback, to a bounded depth and skipping
+metadata blocks (usage, moderations, system warnings) that never hold the reply.
+
+loads() uses orjson when it is installed and the standard json module otherwise.
+"""
+import json
+import os
+from typing import Any, Optional
+
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+EXTRACT_MAX_DEPTH = int(os.getenv("EXTRACT_MAX_DEPTH", "6"))
+
+# Keys tried first by the generic walk, in order
+_TEXT_KEYS = ("message", "messages", "content", "text", "output", "generated_text", "response")
+_TEXT_KEY_SET = frozenset(_TEXT_KEYS)
+_NODE_TYPES = (dict, list, str)
+# Never contain the assistant reply; skipping them keeps the fallback cheap and correct
+_SKIP_KEYS = frozenset((
+    "usage", "moderations", "moderation", "system", "warnings", "id", "model", "model_id",
+    "model_version", "created", "created_at", "object", "role", "finish_reason", "stop_reason",
+    "input_token_count", "generated_token_count", "seed", "logprobs", "tool_calls",
+))
+
+JSON_DECODER = "orjson" if orjson is not None else "json"
+
+
+def loads(data) -> Any:
+    """Decode a JSON document from bytes or str."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _content_text(content) -> Optional[str]:
+    """message.content is a string, or a list of parts like {"type": "text", "text": ...}."""
+    if isinstance(content, str):
+        return content or None
+    if isinstance(content, list):
+        parts = [(p.get("text") or "") if isinstance(p, dict) else str(p) for p in content]
+        return "".join(parts) or None
+    return None
+
+
+def _fast_path(obj: dict) -> Optional[str]:
+    choices = obj.get("choices")
+    if isinstance(choices, list) and choices and isinstance(choices[0], dict):
+        c = choices[0]
+        for key in ("message", "delta"):
+            msg = c.get(key)
+            if isinstance(msg, dict):
+                text = _content_text(msg.get("content"))
+                if text:
+                    return text
+        if isinstance(c.get("text"), str) and c["text"]:
+            return c["text"]
+    results = obj.get("results")
+    if isinstance(results, list) and results and isinstance(results[0], dict):
+        text = results[0].get("generated_text")
+        if isinstance(text, str) and text:
+            return text
+    return None
+
+
+def _walk(obj, depth: int) -> Optional[str]:
+    kind = type(obj)
+    if kind is str:
+        return obj or None
+    if depth <= 0:
+        return None
+    if kind is list:
+        for item in obj:
+            if type(item) in _NODE_TYPES:
+                t = _walk(item, depth - 1)
+                if t:
+                    return t
+        return None
+    if kind is dict:
+        if "choices" in obj or "results" in obj:
+            fast = _fast_path(obj)
+            if fast:
+                return fast
+        text_keys = obj.keys() & _TEXT_KEY_SET
+        if text_keys:
+            for k in _TEXT_KEYS:
+                if k in text_keys:
+                    t = _walk(obj[k], depth - 1)
+                    if t:
+                        return t
+        for k, v in obj.items():
+            if type(v) in _NODE_TYPES and k not in _SKIP_KEYS and k not in text_keys:
+                t = _walk(v, depth - 1)
+                if t:
+                    return t
+    return None
+
+
+def extract_text(obj, max_depth: int = EXTRACT_MAX_DEPTH) -> Optional[str]:
+    """Extract the assistant reply from a watsonx JSON response (or a bare string)."""
+    if obj is None:
+        return None
+    if type(obj) is dict:
+        fast = _fast_path(obj)
+        if fast:
+            return fast
+    return _walk(obj, max_depth)
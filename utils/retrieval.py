@@ -0,0 +1,279 @@
+# utils/retrieval.py
+"""
+Local retrieval over the portfolio's profile data (no network, no GPU).
+
+bio.txt, projects, certificates, skills, internships and contact info are split into
+small chunks and indexed with BM25 using NumPy. Each chat question gets only its top-k
+relevant chunks instead of one large, truncated context blob.
+
+Chunks come from the shared ProfileStore snapshot (utils.profile_store), which owns
+reading and reloading the source files. The index is built on first use and refreshed
+when the snapshot version changes: only sources whose file digest changed are
+re-chunked and re-tokenized; the (small) BM25 weight matrix is then rebuilt.
+"""
+import os
+import re
+import threading
+from typing import Callable, Dict, List, Mapping, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from utils.profile_store import ProfileStore, get_profile_store
+
+TOP_K = int(os.getenv("RETRIEVAL_TOP_K", "6"))
+MAX_CHUNK_CHARS = 600
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#.\-]*[a-z0-9+#]|[a-z0-9]")
+_STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from has have her hers how i in is it its me "
+    "my of on or she so that the their them they this to was what when where which who why "
+    "will with you your tell about please give any".split()
+)
+
+
+# Recruiter wording -> vocabulary actually used in the profile data
+_QUERY_EXPANSIONS = {
+    "skillset": ["skill", "programming", "framework", "tool"],
+    "stack": ["tech", "skill", "framework"],
+    "strength": ["skill", "expertise", "specialize"],
+    "weaknesse": ["growing", "learning"],
+    "achievement": ["certification", "certified", "project", "built"],
+    "background": ["about", "internship", "m.sc", "experience"],
+    "experience": ["internship", "experienced"],
+    "education": ["m.sc", "university", "post-graduated"],
+    "latest": ["watsonx-powered", "portfolio"],
+    "recent": ["watsonx-powered", "portfolio"],
+    "contact": ["email", "linkedin", "github"],
+    "reach": ["email", "linkedin", "contact"],
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens (keeps tech names like c++, node.js), stopwords and plural 's' dropped."""
+    out = []
+    for tok in _TOKEN.findall((text or "").lower()):
+        if tok in _STOPWORDS:
+            continue
+        if len(tok) > 3 and tok.endswith("s") and not tok.endswith("ss"):
+            tok = tok[:-1]
+        out.append(tok)
+    return out
+
+
+def _split_long(text: str, limit: int = MAX_CHUNK_CHARS) -> List[str]:
+    if len(text) <= limit:
+        return [text]
+    pieces, cur = [], ""
+    for sentence in re.split(r"(?<=[.!?])\s+", text):
+        if cur and len(cur) + len(sentence) + 1 > limit:
+            pieces.append(cur)
+            cur = sentence
+        else:
+            cur = f"{cur} {sentence}".strip()
+    if cur:
+        pieces.append(cur)
+    return pieces
+
+
+# --- Source chunkers: each takes the snapshot's source data and returns chunk texts ---
+def _bio_chunks(data: Mapping) -> List[str]:
+    chunks = []
+    for para in re.split(r"\n\s*\n", data.get("bio") or ""):
+        lines = [ln.strip() for ln in para.strip().splitlines() if ln.strip()]
+        if not lines:
+            continue
+        bullets = [ln.lstrip("•-* ").strip() for ln in lines if ln[0] in "•-*"]
+        if bullets:
+            # "X includes: • a • b" -> one chunk per bullet, keeping the heading for context
+            heading = " ".join(ln for ln in lines if ln[0] not in "•-*")
+            chunks.extend(f"{heading} {b}".strip() for b in bullets)
+        else:
+            chunks.extend(_split_long(" ".join(lines)))
+    return chunks
+
+
+def _project_chunks(data: Mapping) -> List[str]:
+    chunks = []
+    for p in data.get("projects") or ():
+        tech = ", ".join(p.get("tech") or ())
+        text = f"Project: {p.get('title', '')}. {p.get('short_description', '')} {p.get('full_description', '')}"
+        if tech:
+            text += f" Tech: {tech}."
+        if p.get("link"):
+            text += f" Link: {p['link']}"
+        chunks.extend(_split_long(" ".join(text.split())))
+    return chunks
+
+
+def _certificate_chunks(data: Mapping) -> List[str]:
+    chunks = []
+    for c in data.get("certificates") or ():
+        category = (c.get("category") or "").upper()
+        label = f" ({category})" if category else ""
+        chunks.append(f"Certification: {c.get('title', '')}{label} by {c.get('issuer', '')} ({c.get('date', '')})")
+    return chunks
+
+
+def _skill_chunks(data: Mapping) -> List[str]:
+    chunks = []
+    for g in data.get("skills") or ():
+        items = [it.get("name", "") if isinstance(it, Mapping) else str(it) for it in g.get("items", ()) or ()]
+        chunks.append(f"Skills – {g.get('category', '')}: {', '.join(items)}")
+    return chunks
+
+
+def _constants_chunks(data: Mapping) -> List[str]:
+    info = data.get("info") or {}
+    socials = data.get("socials") or {}
+    chunks = []
+    about = " ".join(str(info.get(k, "")) for k in ("title", "Intro", "About") if info.get(k))
+    if about:
+        chunks.extend(_split_long(f"About {str(info.get('name', '')).strip()}: {about}"))
+    contact = [f"Email: {info['Email']}"] if info.get("Email") else []
+    contact += [f"{k}: {v}" for k, v in socials.items() if v]
+    if contact:
+        chunks.append("Contact information: " + "; ".join(contact))
+    for it in data.get("internships") or ():
+        period = f" ({it['period']})" if it.get("period") else ""
+        chunks.append(f"Internship experience: {it.get('company', '')}{period}: {it.get('summary', '')}")
+    return chunks
+
+
+# name -> (file that versions it, chunker(source data) -> chunk texts)
+SOURCES: Dict[str, Tuple[str, Callable[[Mapping], List[str]]]] = {
+    "bio": ("bio.txt", _bio_chunks),
+    "project": ("utils/constants.py", _project_chunks),
+    "certificate": ("utils/certificates.py", _certificate_chunks),
+    "skill": ("utils/skill.py", _skill_chunks),
+    "profile": ("utils/constants.py", _constants_chunks),
+}
+
+
+class IndexState(NamedTuple):
+    """One consistent build of the index; replaced as a whole, never modified."""
+    texts: Tuple[str, ...]
+    labels: Tuple[str, ...]
+    vocab: Mapping[str, int]
+    weights: np.ndarray  # (chunks, vocabulary) BM25 weights
+
+
+EMPTY_STATE = IndexState((), (), {}, np.zeros((0, 0), dtype=np.float32))
+
+
+class RetrievalIndex:
+    """BM25 index over profile chunks; refresh() re-reads only changed sources."""
+
+    def __init__(self, sources=SOURCES, store: Optional[ProfileStore] = None):
+        self.sources = sources
+        self.store = store
+        self._lock = threading.Lock()
+        self._digests: Dict[str, str] = {}
+        self._chunks: Dict[str, List[Tuple[str, List[str]]]] = {}  # source -> [(text, tokens)]
+        self._version: Optional[str] = None
+        # Published with one assignment; readers take it once, so a query never mixes builds
+        self.state: IndexState = EMPTY_STATE
+
+    def refresh(self) -> bool:
+        """Bring the index up to date with the profile snapshot. Returns True if it was rebuilt."""
+        snap = (self.store or get_profile_store()).snapshot()
+        if snap.version == self._version:
+            return False
+        with self._lock:
+            if snap.version == self._version:
+                return False
+            changed = False
+            for name, (rel, chunker) in self.sources.items():
+                digest = snap.digests.get(rel)
+                if name in self._digests and self._digests[name] == digest:
+                    continue
+                try:
+                    texts = chunker(snap.data)
+                except Exception as e:
+                    print(f"[retrieval] cannot chunk source {name!r}: {e}")
+                    texts = []
+                self._chunks[name] = [(t, tokenize(t)) for t in texts]
+                self._digests[name] = digest
+                changed = True
+            if changed or not self.state.texts:
+                self._rebuild()
+            self._version = snap.version
+            return changed
+
+    def _rebuild(self):
+        texts, labels, docs = [], [], []
+        for name, chunks in self._chunks.items():
+            for text, toks in chunks:
+                texts.append(text)
+                labels.append(name)
+                docs.append(toks)
+        vocab: Dict[str, int] = {}
+        for toks in docs:
+            for t in toks:
+                vocab.setdefault(t, len(vocab))
+        tf = np.zeros((len(docs), len(vocab)), dtype=np.float32)
+        for i, toks in enumerate(docs):
+            if toks:
+                np.add.at(tf[i], [vocab[t] for t in toks], 1.0)
+        doc_len = tf.sum(axis=1)
+        avgdl = float(doc_len.mean()) if len(docs) else 1.0
+        df = (tf > 0).sum(axis=0)
+        idf = np.log1p((len(docs) - df + 0.5) / (df + 0.5)).astype(np.float32)
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_len / max(avgdl, 1e-9))
+        # Per (chunk, term) BM25 contribution; a query score is a column sum over its terms
+        weights = (idf * tf * (BM25_K1 + 1) / (tf + norm[:, None])).astype(np.float32)
+        weights.setflags(write=False)
+        self.state = IndexState(tuple(texts), tuple(labels), vocab, weights)
+
+    def search(self, query: str, k: int = TOP_K) -> List[Tuple[float, str, str]]:
+        """Top-k (score, source, text) for `query`, best first; empty when nothing matches."""
+        self.refresh()
+        texts, labels, vocab, weights = self.state
+        terms = set(tokenize(query))
+        for t in list(terms):
+            terms.update(_QUERY_EXPANSIONS.get(t, ()))
+        cols = [vocab[t] for t in terms if t in vocab]
+        if not cols or not texts:
+            return []
+        scores = weights[:, cols].sum(axis=1)
+        k = min(k, len(texts))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(float(scores[i]), labels[i], texts[i]) for i in top if scores[i] > 0]
+
+    def overview(self) -> List[Tuple[float, str, str]]:
+        """Fallback context for questions that match nothing: the about text and skills."""
+        self.refresh()
+        texts, labels = self.state.texts, self.state.labels
+        picks = [i for i, (l, t) in enumerate(zip(labels, texts)) if l == "skill" or t.startswith("About ")]
+        return [(0.0, labels[i], texts[i]) for i in picks]
+
+    def stats(self) -> Dict[str, int]:
+        state = self.state
+        return {"chunks": len(state.texts), "vocabulary": len(state.vocab)}
+
+
+_index: Optional[RetrievalIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_index() -> RetrievalIndex:
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = RetrievalIndex()
+    return _index
+
+
+def retrieve_lines(query: str, k: int = TOP_K) -> List[str]:
+    """Top-k relevant profile chunks for `query`, best first, each tagged with its source."""
+    index = get_index()
+    hits = index.search(query, k) or index.overview()
+    return [f"- [{label}] {text}" for _, label, text in hits]
+
+
+def retrieve_context(query: str, k: int = TOP_K) -> str:
+    """retrieve_lines() joined one per line."""
+    return "\n".join(retrieve_lines(query, k))
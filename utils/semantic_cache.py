@@ -0,0 +1,202 @@
+# utils/semantic_cache.py
+"""
+Similarity cache for paraphrased chat questions.
+
+Sits behind the exact-match response cache: "what's her tech stack?" can reuse the
+answer stored for "What is her skillset?". Prompts are reduced to canonical content
+words (stopwords dropped, synonyms folded, light stemming) and embedded as hashed
+character n-gram vectors (utils.intent_router.hash_features, NumPy only). All stored
+vectors live in one preallocated matrix, so a lookup is a single matrix-vector product.
+
+A hit needs cosine similarity >= SEMANTIC_CACHE_THRESHOLD and every content word of
+the question must have a counterpart in the cached one, so "latest project" never
+reuses "earliest project" and "python" never reuses "java". Entries belong to one
+content version; storing a new version drops the old ones. The store is bounded by
+SEMANTIC_CACHE_MAX_ENTRIES with least-recently-used eviction.
+"""
+import os
+import re
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from utils.intent_router import FEATURE_DIM, hash_features
+from utils.response_cache import normalize_prompt
+
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE", "1").lower() not in ("0", "false", "no")
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.8"))
+SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "512"))
+SIMILARITY_BUCKETS = np.linspace(0.0, 1.0, 11)
+LATENCY_WINDOW = 1024  # recent lookup latencies kept for percentiles
+
+STOPWORDS = frozenset("""
+a an the is are was were be been being am do does did has have had her hers she he his him
+i me my we our you your it its this that these those of in on at to for from with by about
+as and or what whats which who whom how tell give can could would will please kindly any
+some there here describe explain list share more us let know main key current currently hold got get
+""".split())
+
+PHRASES = (
+    (re.compile(r"\b(tech|technology|technical) stack\b"), "skills"),
+    (re.compile(r"\bskill ?sets?\b"), "skills"),
+    (re.compile(r"\bmost recent\b"), "latest"),
+    (re.compile(r"\bwork experience\b"), "experience"),
+)
+
+SYNONYMS = {
+    "skill": "skills", "technology": "skills", "technologie": "skills", "tool": "skills", "stack": "skills",
+    "newest": "latest", "recent": "latest", "last": "latest",
+    "certificate": "certification", "cert": "certification", "certified": "certification",
+    "done": "built", "made": "built", "developed": "built", "build": "built", "created": "built",
+    "background": "experience", "career": "experience",
+    "strength": "strengths", "weakness": "weaknesses",
+    "achievement": "achievements", "accomplishment": "achievements",
+}
+
+
+def canonical_tokens(prompt: str) -> Tuple[str, ...]:
+    """Content words of a prompt in a canonical form."""
+    text = normalize_prompt(prompt)
+    for pattern, repl in PHRASES:
+        text = pattern.sub(repl, text)
+    tokens = []
+    for word in text.split():
+        if word in STOPWORDS:
+            continue
+        if word.endswith("sses"):
+            word = word[:-2]
+        elif len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        word = SYNONYMS.get(word, word)
+        if word not in tokens:
+            tokens.append(word)
+    return tuple(tokens)
+
+
+def _percentile_us(sorted_seconds: List[float], q: float) -> float:
+    if not sorted_seconds:
+        return 0.0
+    return round(sorted_seconds[min(len(sorted_seconds) - 1, int(q * len(sorted_seconds)))] * 1e6, 1)
+
+
+def _covered(query: Tuple[str, ...], cached: Tuple[str, ...]) -> bool:
+    """Every query word matches a cached word (equal, or sharing a 5-letter prefix)."""
+    return all(any(q == c or (len(q) >= 5 and len(c) >= 5 and q[:5] == c[:5]) for c in cached) for q in query)
+
+
+class SemanticCache:
+    """Thread-safe nearest-neighbour answer cache for one content version at a time."""
+
+    def __init__(self, max_entries: int = SEMANTIC_CACHE_MAX_ENTRIES, threshold: float = SEMANTIC_CACHE_THRESHOLD,
+                 dim: int = FEATURE_DIM):
+        self.max_entries = max(1, int(max_entries))
+        self.threshold = float(threshold)
+        self._lock = threading.Lock()
+        self._vectors = np.zeros((self.max_entries, dim), dtype=np.float32)
+        self._tokens: List[Optional[Tuple[str, ...]]] = [None] * self.max_entries
+        self._answers: List[Optional[str]] = [None] * self.max_entries
+        self._last_used = np.zeros(self.max_entries, dtype=np.float64)
+        self._size = 0
+        self._version: Optional[str] = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._similarity_counts = np.zeros(len(SIMILARITY_BUCKETS) - 1, dtype=np.int64)
+        self._latencies: List[float] = []
+
+    def _embed(self, prompt: str) -> Tuple[Tuple[str, ...], np.ndarray]:
+        tokens = canonical_tokens(prompt)
+        return tokens, hash_features(" ".join(tokens))
+
+    def get(self, prompt: str, version: str) -> Optional[str]:
+        """Answer of the most similar stored prompt for `version`, or None."""
+        t0 = time.perf_counter()
+        tokens, vec = self._embed(prompt)
+        answer = None
+        with self._lock:
+            best = 0.0
+            if tokens and self._size and self._version == version:
+                sims = self._vectors[:self._size] @ vec
+                idx = int(np.argmax(sims))
+                best = float(sims[idx])
+                if best >= self.threshold and _covered(tokens, self._tokens[idx]):
+                    answer = self._answers[idx]
+                    self._last_used[idx] = time.monotonic()
+            if answer is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            bucket = min(int(best * (len(SIMILARITY_BUCKETS) - 1)), len(SIMILARITY_BUCKETS) - 2)
+            self._similarity_counts[max(bucket, 0)] += 1
+            self._latencies.append(time.perf_counter() - t0)
+            if len(self._latencies) > LATENCY_WINDOW:
+                del self._latencies[:len(self._latencies) - LATENCY_WINDOW]
+        return answer
+
+    def put(self, prompt: str, version: str, answer: str):
+        tokens, vec = self._embed(prompt)
+        if not tokens or not answer:
+            return
+        with self._lock:
+            if self._version != version:
+                self._clear_locked()
+                self._version = version
+            if self._size and tokens in self._tokens[:self._size]:
+                idx = self._tokens.index(tokens)
+            elif self._size < self.max_entries:
+                idx = self._size
+                self._size += 1
+            else:
+                idx = int(np.argmin(self._last_used[:self._size]))
+                self.evictions += 1
+            self._vectors[idx] = vec
+            self._tokens[idx] = tokens
+            self._answers[idx] = answer
+            self._last_used[idx] = time.monotonic()
+
+    def clear(self):
+        with self._lock:
+            self._clear_locked()
+
+    def _clear_locked(self):
+        self._vectors[:self._size] = 0.0
+        self._tokens = [None] * self.max_entries
+        self._answers = [None] * self.max_entries
+        self._last_used[:] = 0.0
+        self._size = 0
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            latencies = sorted(self._latencies)
+            return {
+                "entries": self._size,
+                "max_entries": self.max_entries,
+                "threshold": self.threshold,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "similarity_histogram": {
+                    f"{lo:.1f}-{hi:.1f}": int(n)
+                    for lo, hi, n in zip(SIMILARITY_BUCKETS[:-1], SIMILARITY_BUCKETS[1:], self._similarity_counts)
+                },
+                "lookup_us_p50": _percentile_us(latencies, 0.50),
+                "lookup_us_p95": _percentile_us(latencies, 0.95),
+            }
+
+
+# --- Process-wide instance shared by all sessions ---
+_cache: Optional[SemanticCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_semantic_cache() -> SemanticCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = SemanticCache(SEMANTIC_CACHE_MAX_ENTRIES, SEMANTIC_CACHE_THRESHOLD)
+    return _cache
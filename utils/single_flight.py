@@ -0,0 +1,153 @@
+# utils/single_flight.py
+"""
+Request coalescing for identical in-flight prompts, plus double-submit protection.
+
+SingleFlight.run(key, fn) starts `fn(publish)` (the watsonx call) on a worker thread
+the first time a key is seen; concurrent callers with the same key attach to that
+call instead of starting their own. Every caller, including the first, waits from its
+own thread, follows the partial text the call publishes (queue position, streamed
+tokens) and receives the same result. Because the call does not run on a session's
+script thread, a rerun that interrupts the waiting session does not cancel it; the
+session simply attaches again on its next run.
+
+Sessions register a submitted prompt with begin_session(); a second submit from the
+same session is rejected until end_session() (or SESSION_PENDING_TTL, so a lost
+release never locks a session).
+"""
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+SINGLE_FLIGHT_WAIT = float(os.getenv("SINGLE_FLIGHT_WAIT", "180"))
+SESSION_PENDING_TTL = float(os.getenv("SESSION_PENDING_TTL", "180"))
+POLL_INTERVAL = 0.1  # how often waiters check for new partial text
+
+
+class _Call:
+    __slots__ = ("cond", "done", "result", "error", "partial")
+
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.done = False
+        self.result: Any = None
+        self.error: Optional[Exception] = None
+        self.partial: Optional[str] = None
+
+
+class SingleFlight:
+    """Process-wide registry of in-flight calls (by key) and pending submits (by session)."""
+
+    def __init__(self, wait_timeout: float = SINGLE_FLIGHT_WAIT, pending_ttl: float = SESSION_PENDING_TTL):
+        self.wait_timeout = float(wait_timeout)
+        self.pending_ttl = float(pending_ttl)
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self._sessions: Dict[str, float] = {}  # session id -> pending until (monotonic)
+        self._stats = {"calls": 0, "coalesced": 0, "errors": 0, "wait_timeouts": 0, "rejected_submits": 0}
+
+    # --- Coalescing ---
+    def run(self, key: str, fn: Callable[[Callable[[str], None]], Any],
+            on_partial: Optional[Callable[[str], None]] = None) -> Tuple[Any, bool]:
+        """
+        Result of `fn(publish)` for `key`, shared with every concurrent caller of the key.
+        Returns (result, coalesced); coalesced is True when an existing call was joined.
+        Exceptions raised by `fn` are re-raised in every caller; TimeoutError after
+        SINGLE_FLIGHT_WAIT seconds.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            coalesced = call is not None
+            if coalesced:
+                self._stats["coalesced"] += 1
+            else:
+                call = self._calls[key] = _Call()
+                self._stats["calls"] += 1
+                threading.Thread(target=self._execute, args=(key, call, fn), name="single-flight", daemon=True).start()
+        if not self._wait(call, on_partial):
+            with self._lock:
+                self._stats["wait_timeouts"] += 1
+            raise TimeoutError("Timed out waiting for the model.")
+        if call.error is not None:
+            raise call.error
+        return call.result, coalesced
+
+    def _execute(self, key: str, call: _Call, fn: Callable):
+        def publish(partial: str):
+            with call.cond:
+                call.partial = partial
+                call.cond.notify_all()
+
+        try:
+            call.result = fn(publish)
+        except Exception as e:
+            call.error = e
+            with self._lock:
+                self._stats["errors"] += 1
+        finally:
+            with self._lock:
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+            with call.cond:
+                call.done = True
+                call.cond.notify_all()
+
+    def _wait(self, call: _Call, on_partial: Optional[Callable[[str], None]]) -> bool:
+        deadline = time.monotonic() + self.wait_timeout
+        shown = None
+        while True:
+            with call.cond:
+                if not call.done and call.partial == shown:
+                    call.cond.wait(min(POLL_INTERVAL, max(0.0, deadline - time.monotonic())))
+                done, partial = call.done, call.partial
+            if done:
+                return True
+            if on_partial is not None and partial is not None and partial != shown:
+                shown = partial
+                on_partial(partial)  # outside the lock; may raise to stop this waiter only
+            if time.monotonic() >= deadline:
+                return False
+
+    # --- Double-submit protection ---
+    def begin_session(self, session_id: str) -> bool:
+        """Mark a submit as pending for `session_id`; False if one is already pending."""
+        now = time.monotonic()
+        with self._lock:
+            if self._sessions.get(session_id, 0.0) > now:
+                self._stats["rejected_submits"] += 1
+                return False
+            if len(self._sessions) > 1024:
+                self._sessions = {sid: until for sid, until in self._sessions.items() if until > now}
+            self._sessions[session_id] = now + self.pending_ttl
+            return True
+
+    def session_pending(self, session_id: str) -> bool:
+        with self._lock:
+            return self._sessions.get(session_id, 0.0) > time.monotonic()
+
+    def end_session(self, session_id: str):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            now = time.monotonic()
+            return {
+                **self._stats,
+                "in_flight": len(self._calls),
+                "pending_sessions": sum(1 for until in self._sessions.values() if until > now),
+            }
+
+
+# --- Process-wide instance shared by all sessions ---
+_flights: Optional[SingleFlight] = None
+_flights_lock = threading.Lock()
+
+
+def get_single_flight() -> SingleFlight:
+    global _flights
+    if _flights is None:
+        with _flights_lock:
+            if _flights is None:
+                _flights = SingleFlight(SINGLE_FLIGHT_WAIT, SESSION_PENDING_TTL)
+    return _flights
@@ -2,6 +2,10 @@
 import html as _html
 import os
 
+from utils.fragment_cache import cached_fragment
+
+
+@cached_fragment("skills", sources=("utils/skill.py",))
 def render_skills_html(skills_list, columns=2, card_size=96):
     try:
         cols = max(1, int(columns))
@@ -202,6 +206,3 @@ skills = [
         ]
     }
 ]
-
-# small import confirmation printed to terminal
-print("[utils.skill] glass-pills version loaded — groups =", len(skills))
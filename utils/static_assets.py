@@ -0,0 +1,113 @@
+# utils/static_assets.py
+"""
+Images as static, cacheable files instead of base64 inlined into every rerun.
+
+In "static" mode (the default when server.enableStaticServing is on) each image, or
+its derivative from utils.image_derivatives, is published once into static/assets/
+under a content-hashed name and referenced by URL (/app/static/assets/...). The name
+changes whenever the bytes change, so browsers can keep the file forever: serve.py
+runs the app with ImmutableAssetHeaders, which marks those URLs
+"Cache-Control: public, max-age=31536000, immutable". Under plain
+`streamlit run landing.py` they are still revalidated cheaply via ETag.
+
+"inline" mode (IMAGE_ASSET_MODE=inline, or static serving off) keeps data URIs.
+"""
+import hashlib
+import os
+from pathlib import Path
+from typing import Optional
+
+from utils.asset_registry import get_asset_registry
+from utils.image_derivatives import MIME, resolve_source, derivative_path, image_data_uri
+
+APP_ROOT = Path(__file__).resolve().parent.parent
+# Streamlit serves <main script dir>/static at /app/static when static serving is on
+ASSET_DIR = APP_ROOT / "static" / "assets"
+ASSET_ROUTE = "app/static/assets/"
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def asset_mode() -> str:
+    """Either "static" or "inline"; IMAGE_ASSET_MODE overrides the config-derived default."""
+    mode = os.getenv("IMAGE_ASSET_MODE", "").strip().lower()
+    if mode in ("static", "inline"):
+        return mode
+    try:
+        import streamlit as st
+        return "static" if st.get_option("server.enableStaticServing") else "inline"
+    except Exception:
+        return "inline"
+
+
+def _base_path() -> str:
+    try:
+        import streamlit as st
+        base = (st.get_option("server.baseUrlPath") or "").strip("/")
+    except Exception:
+        base = ""
+    return f"/{base}/" if base else "/"
+
+
+def publish(rel_path: str, variant: Optional[str] = None) -> Optional[str]:
+    """
+    Copy the image (or its `variant` derivative) into static/assets under a
+    content-hashed name and return its URL; None when the file cannot be published.
+    """
+    src = resolve_source(rel_path)
+    if src is None or src.suffix.lower() not in MIME:
+        return None
+
+    def build() -> Optional[str]:
+        try:
+            file = Path(derivative_path(str(src), variant)) if variant else src
+            data = file.read_bytes()
+            stem = "".join(ch if ch.isalnum() else "_" for ch in src.stem)
+            name = f"{stem}-{variant or 'orig'}-{hashlib.sha1(data).hexdigest()[:16]}{file.suffix.lower()}"
+            target = ASSET_DIR / name
+            if not target.exists():
+                ASSET_DIR.mkdir(parents=True, exist_ok=True)
+                tmp = target.with_name(f".{name}.{os.getpid()}.tmp")
+                tmp.write_bytes(data)
+                os.replace(tmp, target)
+        except OSError as e:
+            print(f"[static_assets] could not publish {rel_path}: {e}")
+            return None
+        return f"{_base_path()}{ASSET_ROUTE}{name}"
+
+    return get_asset_registry().get(src, variant, "static_url", build)
+
+
+def image_src(rel_path: str, variant: Optional[str] = None) -> str:
+    """
+    Value for an <img src>: a static URL in static mode, a data URI otherwise.
+    Remote URLs and data URIs pass through; unreadable paths come back unchanged.
+    """
+    if not rel_path or rel_path.startswith(("data:", "http://", "https://")):
+        return rel_path or ""
+    if asset_mode() == "static":
+        url = publish(rel_path, variant)
+        if url:
+            return url
+    return image_data_uri(rel_path, variant)
+
+
+class ImmutableAssetHeaders:
+    """ASGI middleware: long-lived cache headers for content-hashed asset URLs."""
+
+    def __init__(self, app, route: str = ASSET_ROUTE):
+        self.app = app
+        self.route = route
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.route not in scope.get("path", ""):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start" and message.get("status") == 200:
+                headers = [(k, v) for k, v in message.get("headers", []) if k.lower() != b"cache-control"]
+                headers.append((b"cache-control", CACHE_CONTROL.encode()))
+                message = dict(message, headers=headers)
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
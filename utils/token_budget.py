@@ -0,0 +1,97 @@
+# utils/token_budget.py
+"""
+Token budgeting for chat prompts and generation length.
+
+Token counts come from a local estimator (no tokenizer download): one token per ~4
+characters of each word plus one per punctuation mark, which errs on the high side for
+English text so the budget is not overshot.
+
+The input budget is filled in priority order: the compiled instruction (rules,
+contact block, latest project) and the user turn always go in; optional sections such
+as retrieved excerpts are added best-first until the budget is spent. Each question is
+also classified so short questions (greetings, contact, availability) get a small
+`max_tokens` and finish quickly. The class is the intent router's decision
+(utils.intent_router), so both agree on what a contact or availability question is.
+"""
+import math
+import os
+import re
+from typing import Dict, List, Sequence
+
+from utils.intent_router import get_intent_router
+
+INPUT_TOKEN_BUDGET = int(os.getenv("CHAT_INPUT_TOKEN_BUDGET", "2048"))
+# Longer user turns are cut to this many tokens before the budget is applied
+USER_TURN_MAX_TOKENS = int(os.getenv("CHAT_USER_TURN_MAX_TOKENS", "400"))
+CHARS_PER_TOKEN = 4.0
+
+# max_tokens per question type (intent router intents); "general" covers everything else
+MAX_NEW_TOKENS = {
+    "greeting": int(os.getenv("CHAT_MAX_TOKENS_GREETING", "80")),
+    "contact": int(os.getenv("CHAT_MAX_TOKENS_CONTACT", "100")),
+    "availability": int(os.getenv("CHAT_MAX_TOKENS_AVAILABILITY", "80")),
+    "salary": int(os.getenv("CHAT_MAX_TOKENS_SALARY", "150")),
+    "general": int(os.getenv("CHAT_MAX_TOKENS", "700")),
+}
+# Keep the model from writing the next conversation turn itself
+STOP_SEQUENCES = ["[USER]", "[SYSTEM INSTRUCTION]", "\nUser:"]
+
+_PIECE = re.compile(r"\w+|[^\w\s]")
+def _piece_tokens(piece: str) -> int:
+    return math.ceil(len(piece) / CHARS_PER_TOKEN) if piece[0].isalnum() or piece[0] == "_" else 1
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of `text`."""
+    if not text:
+        return 0
+    return sum(_piece_tokens(piece) for piece in _PIECE.findall(text))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut `text` so that estimate_tokens(result) <= max_tokens (on a piece boundary)."""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    used = 0
+    for m in _PIECE.finditer(text):
+        cost = _piece_tokens(m.group())
+        if used + cost > max_tokens:
+            return text[: m.start()].rstrip()
+        used += cost
+    return text
+
+
+def classify_question(prompt: str) -> str:
+    """
+    'greeting', 'contact', 'availability', 'salary' or 'general'. Multi-part, long or
+    open-ended questions are 'general' and get a full-length answer.
+
+    >>> classify_question("Can she join our team as a GenAI engineer?")
+    'general'
+    >>> classify_question("What is her email spam classifier project?")
+    'general'
+    >>> classify_question("What is her email?")
+    'contact'
+    """
+    intent = get_intent_router().classify(prompt or "").intent
+    return intent if intent in MAX_NEW_TOKENS else "general"
+
+
+def generation_params(prompt: str) -> Dict[str, object]:
+    """Chat payload generation parameters sized for the kind of question asked."""
+    return {"max_tokens": MAX_NEW_TOKENS[classify_question(prompt)], "stop": list(STOP_SEQUENCES)}
+
+
+def fit_sections(required: Sequence[str], optional: Sequence[str], budget: int = INPUT_TOKEN_BUDGET) -> List[str]:
+    """
+    Return the optional sections (in their given, best-first order) that fit in `budget`
+    after the required ones. Required sections are never dropped, even over budget.
+    """
+    remaining = budget - sum(estimate_tokens(s) for s in required)
+    kept = []
+    for section in optional:
+        cost = estimate_tokens(section)
+        if cost <= remaining:
+            kept.append(section)
+            remaining -= cost
+    return kept
@@ -0,0 +1,436 @@
+# utils/watsonx_client.py
+"""
+Shared watsonx client used by the chat page and diag_infer1.py.
+
+Holds one pooled requests.Session and one IAM token cache per process.
+"""
+import json
+import os
+import threading
+import time
+from typing import Optional
+
+import requests
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+
+from utils.metrics import observe_stage, record_upstream, record_usage, stage_timer
+from utils.resilience import REQUEST_DEADLINE, call_with_retries, parse_retry_after
+from utils.response_parser import loads
+
+load_dotenv()
+
+IBM_APIKEY = os.getenv("IBM_APIKEY")
+_raw_ml_base = (os.getenv("WATSONX_RUNTIME_URL") or os.getenv("IBM_ML_URL") or os.getenv("IBM_URL") or "").rstrip('/')
+for suffix in ["/ml/v1", "/ml/v4", "/ml", "/api"]:
+    if _raw_ml_base.endswith(suffix):
+        _raw_ml_base = _raw_ml_base[: -len(suffix)].rstrip('/')
+ML_BASE = _raw_ml_base
+DEPLOYMENT_ID = os.getenv("WATSONX_DEPLOYMENT_ID")
+API_VERSION = "2021-05-01"
+IAM_URL = os.getenv("IBM_IAM_URL", "https://iam.cloud.ibm.com/identity/token")
+# Stream replies token-by-token from text/chat_stream (set WATSONX_STREAMING=0 to disable)
+STREAMING = os.getenv("WATSONX_STREAMING", "1").strip().lower() not in ("0", "false", "no", "off")
+
+# Keep-alive pool per host; sized for concurrent Streamlit sessions
+POOL_MAXSIZE = int(os.getenv("WATSONX_POOL_MAXSIZE", "32"))
+
+# --- Shared HTTP session ---
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+def get_session() -> requests.Session:
+    """
+    Return the process-wide requests.Session. Connections to IAM and the ML endpoint
+    are kept alive and reused, so TCP+TLS setup is paid once per pooled connection
+    instead of once per message.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                s = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_MAXSIZE, pool_block=False)
+                s.mount("https://", adapter)
+                s.mount("http://", adapter)
+                _session = s
+    return _session
+
+def reset_session():
+    """Close the shared session (its pooled connections); the next call opens a new one."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+
+# --- IAM token manager (one per process) ---
+# Renew this many seconds before expiry (capped at half the token lifetime)
+IAM_REFRESH_MARGIN = float(os.getenv("IAM_REFRESH_MARGIN", "600"))
+# Callers never use a token closer to expiry than this
+IAM_MIN_VALIDITY = 30
+
+def _fetch_iam_token():
+    """Exchange the API key for an IAM access token. Returns (token, expires_in)."""
+    if not IBM_APIKEY:
+        raise RuntimeError("Missing IBM_APIKEY in environment.")
+    data = {"grant_type": "urn:ibm:params:oauth:grant-type:apikey", "apikey": IBM_APIKEY}
+    headers = {"Content-Type": "application/x-www-form-urlencoded"}
+    r = get_session().post(IAM_URL, data=data, headers=headers, timeout=30)
+    r.raise_for_status()
+    j = r.json()
+    return j.get("access_token"), int(j.get("expires_in", 3600))
+
+class TokenManager:
+    """
+    Thread-safe IAM token holder.
+
+    Only one caller refreshes at a time; concurrent callers wait for that result instead
+    of stampeding IAM. After the first fetch a daemon thread renews the token well before
+    it expires, so request threads normally never wait on IAM.
+    """
+
+    def __init__(self, fetch=_fetch_iam_token, refresh_margin=IAM_REFRESH_MARGIN, min_validity=IAM_MIN_VALIDITY):
+        self._fetch = fetch
+        self.refresh_margin = float(refresh_margin)
+        self.min_validity = float(min_validity)
+        self._token = None
+        self._expires_at = 0.0
+        self._lifetime = 0.0
+        self._refresh_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._renewer = None
+        self._stats = {"fetches": 0, "failures": 0, "waits": 0, "fetch_seconds_total": 0.0,
+                       "fetch_seconds_last": 0.0, "fetch_seconds_max": 0.0}
+
+    def get(self) -> str:
+        token, expires_at = self._token, self._expires_at
+        if token and time.time() < expires_at - self.min_validity:
+            return token
+        if not self._refresh_lock.acquire(blocking=False):
+            # Someone else is refreshing: wait for their result
+            with self._stats_lock:
+                self._stats["waits"] += 1
+            self._refresh_lock.acquire()
+        try:
+            if self._token and time.time() < self._expires_at - self.min_validity:
+                return self._token
+            self._refresh()
+        finally:
+            self._refresh_lock.release()
+        self._ensure_renewer()
+        return self._token
+
+    def invalidate(self):
+        """Drop the cached token (e.g. after a 401); the next get() fetches a new one."""
+        with self._refresh_lock:
+            self._token = None
+            self._expires_at = 0.0
+
+    def stats(self):
+        with self._stats_lock:
+            out = dict(self._stats)
+        out["fetch_seconds_avg"] = out["fetch_seconds_total"] / out["fetches"] if out["fetches"] else 0.0
+        out["expires_in"] = max(0.0, self._expires_at - time.time())
+        return out
+
+    def _refresh(self):
+        started = time.perf_counter()
+        try:
+            token, expires_in = self._fetch()
+        except Exception:
+            with self._stats_lock:
+                self._stats["failures"] += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._stats_lock:
+                self._stats["fetches"] += 1
+                self._stats["fetch_seconds_total"] += elapsed
+                self._stats["fetch_seconds_last"] = elapsed
+                self._stats["fetch_seconds_max"] = max(self._stats["fetch_seconds_max"], elapsed)
+        self._lifetime = float(expires_in)
+        self._expires_at = time.time() + expires_in
+        self._token = token
+
+    def _renew_at(self) -> float:
+        return self._expires_at - min(self.refresh_margin, self._lifetime / 2)
+
+    def _ensure_renewer(self):
+        if self._renewer is None or not self._renewer.is_alive():
+            with self._stats_lock:
+                if self._renewer is None or not self._renewer.is_alive():
+                    self._renewer = threading.Thread(target=self._renew_loop, name="iam-token-renewer", daemon=True)
+                    self._renewer.start()
+
+    def _renew_loop(self):
+        backoff = 5.0
+        while True:
+            time.sleep(max(1.0, self._renew_at() - time.time()))
+            if time.time() < self._renew_at():
+                continue  # renewed meanwhile by a foreground caller
+            try:
+                with self._refresh_lock:
+                    self._refresh()
+                backoff = 5.0
+            except Exception as e:
+                print("[watsonx_client] background IAM token renewal failed:", e)
+                # Retry soon; callers keep using the current token while it is valid
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 60.0)
+
+_token_manager = TokenManager()
+
+def get_token_manager() -> TokenManager:
+    return _token_manager
+
+def get_iam_token_cached():
+    """Get an IAM token using the API key; cached and renewed in the background before expiry."""
+    return _token_manager.get()
+
+def _normalize_messages_for_deployment(messages):
+    """
+    Convert a messages list (may include a 'system' role) into a deployment-friendly messages array
+    where 'system' instructions are merged into the first 'user' message.
+    """
+    msgs = [dict(m) for m in messages]
+    system_parts = []
+    other_msgs = []
+    for m in msgs:
+        role = m.get("role", "").lower()
+        content = m.get("content", "")
+        # Normalize content
+        if isinstance(content, list):
+            try:
+                content = " ".join(p.get("text", str(p)) if isinstance(p, dict) else str(p) for p in content)
+            except Exception:
+                content = str(content)
+        elif isinstance(content, dict):
+            content = json.dumps(content)
+        if role == "system":
+            system_parts.append(content)
+        else:
+            other_msgs.append({"role": role, "content": content})
+    if system_parts:
+        system_text = "\n".join(system_parts).strip()
+        for i, m in enumerate(other_msgs):
+            if m.get("role") == "user":
+                merged = f"[SYSTEM INSTRUCTION]\n{system_text}\n\n[USER]\n{m.get('content','')}"
+                other_msgs[i]["content"] = merged
+                break
+        else:
+            other_msgs.insert(0, {"role": "user", "content": f"[SYSTEM INSTRUCTION]\n{system_text}\n\n"})
+    return other_msgs
+
+def _config_error():
+    """Result dict describing missing configuration, or None when configured."""
+    if not IBM_APIKEY:
+        return {"ok": False, "status": 0, "text": "Missing IBM_APIKEY in environment."}
+    if not ML_BASE:
+        return {"ok": False, "status": 0, "text": "Missing WATSONX_RUNTIME_URL or IBM_ML_URL/IBM_URL in environment."}
+    if not DEPLOYMENT_ID:
+        return {"ok": False, "status": 0, "text": "Missing WATSONX_DEPLOYMENT_ID in environment."}
+    return None
+
+def _error_result(r, endpoint, kind):
+    record_upstream(kind, r.status_code, False)
+    if r.status_code == 401:
+        _token_manager.invalidate()
+    return {
+        "ok": False,
+        "status": r.status_code,
+        "text": r.text,
+        "endpoint": endpoint,
+        "retry_after": parse_retry_after(r.headers.get("Retry-After")),
+    }
+
+def _chat_payload(payload_messages, params):
+    """Chat request body; `params` adds generation settings such as max_tokens and stop."""
+    payload = {"messages": payload_messages}
+    if params:
+        payload.update(params)
+    return payload
+
+def _iam_token():
+    """get_iam_token_cached() timed as the iam_token stage; failures count as status "iam"."""
+    try:
+        with stage_timer("iam_token"):
+            return get_iam_token_cached()
+    except Exception:
+        record_upstream("iam", "iam", False)
+        raise
+
+def _chat_once(payload_messages, timeout, params=None):
+    """One text/chat attempt."""
+    try:
+        token = _iam_token()
+    except Exception as e:
+        return {"ok": False, "status": 0, "iam_error": True, "text": f"IAM token error: {e}"}
+    endpoint = f"{ML_BASE}/ml/v1/deployments/{DEPLOYMENT_ID}/text/chat?version={API_VERSION}"
+    headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json", "Accept": "application/json"}
+    payload = _chat_payload(payload_messages, params)
+    try:
+        with stage_timer("http"):
+            r = get_session().post(endpoint, headers=headers, json=payload, timeout=timeout)
+    except Exception as e:
+        record_upstream("chat", 0, False)
+        return {"ok": False, "status": 0, "text": f"Request failed: {e}", "endpoint": endpoint}
+    if not r.ok:
+        return _error_result(r, endpoint, "chat")
+    try:
+        with stage_timer("json_decode"):
+            j = loads(r.content)
+    except Exception:
+        record_upstream("chat", "bad_json", False)
+        return {"ok": False, "status": r.status_code, "text": r.text, "endpoint": endpoint}
+    record_upstream("chat", r.status_code, True)
+    record_usage(j.get("usage") if isinstance(j, dict) else None)
+    return {"ok": True, "json": j, "endpoint": endpoint}
+
+def infer_with_system_messages(messages, timeout=60, deadline=None, params=None):
+    """
+    Call the Watsonx deployment text/chat endpoint. Messages may include a 'system' role;
+    we inline them for deployments. `params` (e.g. max_tokens, stop) is merged into the
+    request body. Transient failures are retried within `deadline` seconds (default
+    WATSONX_DEADLINE) behind the shared circuit breaker.
+    """
+    err = _config_error()
+    if err:
+        return err
+    with stage_timer("normalize_messages"):
+        payload_messages = _normalize_messages_for_deployment(messages)
+    with stage_timer("upstream_total"):
+        return call_with_retries(lambda t: _chat_once(payload_messages, t, params), timeout=timeout, deadline=deadline)
+
+STREAM_DONE = object()  # yielded by _iter_sse_data for the `[DONE]` terminator
+
+def _iter_sse_data(response):
+    """Yield the decoded JSON payload of each `data:` event of a server-sent events response."""
+    for line in response.iter_lines(decode_unicode=True):
+        if not line or not line.startswith("data:"):
+            continue
+        data = line[len("data:"):].strip()
+        if not data:
+            continue
+        if data == "[DONE]":
+            yield STREAM_DONE
+            return
+        try:
+            yield loads(data)
+        except ValueError:
+            continue
+
+def _delta_text(event) -> str:
+    """Extract the incremental text of one streamed chat (or generation) event."""
+    if not isinstance(event, dict):
+        return ""
+    choices = event.get("choices")
+    if isinstance(choices, list) and choices and isinstance(choices[0], dict):
+        delta = choices[0].get("delta") or choices[0].get("message") or {}
+        if isinstance(delta, dict):
+            return delta.get("content") or ""
+    results = event.get("results")
+    if isinstance(results, list) and results and isinstance(results[0], dict):
+        return results[0].get("generated_text") or ""
+    return ""
+
+def _is_final_event(event) -> bool:
+    """True for an event carrying a finish reason (the model completed its reply)."""
+    if not isinstance(event, dict):
+        return False
+    choices = event.get("choices")
+    if isinstance(choices, list) and choices and isinstance(choices[0], dict):
+        return bool(choices[0].get("finish_reason"))
+    results = event.get("results")
+    if isinstance(results, list) and results and isinstance(results[0], dict):
+        return results[0].get("stop_reason") not in (None, "", "not_finished")
+    return False
+
+def _chat_stream_once(payload_messages, on_delta, timeout, params=None):
+    """One text/chat_stream attempt; {"stream_unsupported": True} when the deployment does not stream."""
+    try:
+        token = _iam_token()
+    except Exception as e:
+        return {"ok": False, "status": 0, "iam_error": True, "text": f"IAM token error: {e}"}
+    endpoint = f"{ML_BASE}/ml/v1/deployments/{DEPLOYMENT_ID}/text/chat_stream?version={API_VERSION}"
+    headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json", "Accept": "text/event-stream"}
+    payload = _chat_payload(payload_messages, params)
+    started = time.perf_counter()
+    try:
+        r = get_session().post(endpoint, headers=headers, json=payload, timeout=timeout, stream=True)
+    except Exception as e:
+        record_upstream("chat_stream", 0, False)
+        return {"ok": False, "status": 0, "text": f"Request failed: {e}", "endpoint": endpoint}
+    observe_stage("http", time.perf_counter() - started)  # until response headers; the body is the stream stage
+    with r:
+        content_type = r.headers.get("Content-Type", "")
+        if r.status_code in (404, 405, 501) or (r.ok and "text/event-stream" not in content_type):
+            record_upstream("chat_stream", "unsupported", True)
+            return {"ok": False, "status": r.status_code, "stream_unsupported": True, "endpoint": endpoint}
+        if not r.ok:
+            return _error_result(r, endpoint, "chat_stream")
+        parts = []
+        usage = None
+        first_token_s = None
+        finished = False
+        try:
+            for event in _iter_sse_data(r):
+                if event is STREAM_DONE or _is_final_event(event):
+                    finished = True
+                if isinstance(event, dict) and event.get("usage"):
+                    usage = event["usage"]
+                delta = _delta_text(event)
+                if not delta:
+                    continue
+                if first_token_s is None:
+                    first_token_s = time.perf_counter() - started
+                parts.append(delta)
+                if on_delta is not None:
+                    on_delta("".join(parts))
+        except Exception as e:
+            if not parts:
+                # Nothing shown yet, so the attempt can safely be retried
+                record_upstream("chat_stream", "stream_error", False)
+                return {"ok": False, "status": 0, "text": f"Stream failed: {e}", "endpoint": endpoint}
+            finished = False
+    if not finished:
+        # Connection dropped mid-reply (no [DONE], no finish_reason): the text is incomplete.
+        # Not retried here (the partial text is already on screen); the caller falls back to text/chat
+        record_upstream("chat_stream", "truncated", False)
+        return {"ok": False, "status": r.status_code, "truncated": True, "partial": "".join(parts),
+                "text": "The reply stream ended before the reply was complete.", "endpoint": endpoint}
+    observe_stage("stream", time.perf_counter() - started)
+    if first_token_s is not None:
+        observe_stage("ttft", first_token_s)
+    record_upstream("chat_stream", r.status_code, True)
+    record_usage(usage)
+    text = "".join(parts)
+    j = {"choices": [{"index": 0, "message": {"role": "assistant", "content": text}}]}
+    if usage:
+        j["usage"] = usage
+    return {"ok": True, "json": j, "endpoint": endpoint, "streamed": True, "ttft": first_token_s}
+
+def infer_stream_with_system_messages(messages, on_delta=None, timeout=60, deadline=None, params=None):
+    """
+    Call the Watsonx deployment text/chat_stream endpoint and report partial text as it arrives.
+    `on_delta(text_so_far)` is called for every received chunk. Falls back to the blocking
+    text/chat call when the deployment does not stream. Returns the same dict shape as
+    infer_with_system_messages, with the streamed reply wrapped in a chat-style JSON body.
+    Failures before the first token are retried like infer_with_system_messages; a stream
+    that ends without a terminal event (`[DONE]` or a finish_reason) is never returned as a
+    reply: the blocking call answers instead.
+    """
+    err = _config_error()
+    if err:
+        return err
+    budget = REQUEST_DEADLINE if deadline is None else float(deadline)
+    started = time.monotonic()
+    with stage_timer("normalize_messages"):
+        payload_messages = _normalize_messages_for_deployment(messages)
+    with stage_timer("upstream_total"):
+        result = call_with_retries(lambda t: _chat_stream_once(payload_messages, on_delta, t, params), timeout=timeout, deadline=budget)
+    if result.get("stream_unsupported") or result.get("truncated"):
+        # Deployment does not stream, or the stream broke off mid-reply: use the regular
+        # blocking call with what is left of the budget
+        return infer_with_system_messages(messages, timeout=timeout, deadline=budget - (time.monotonic() - started), params=params)
+    return result